@@ -0,0 +1,241 @@
+# Замеры скорости и памяти функций lab3/main.py на синтетических таблицах
+#
+# Запуск:
+#   python lab3/benchmark.py --rows 1000000 --output results.json
+#   python lab3/benchmark.py --rows 1000000 --baseline results.json --threshold 0.2
+# Время - лучшее из --repeat запусков, память - пик выделений tracemalloc в отдельном запуске.
+# При сравнении с базовыми результатами операции, ставшие медленнее или требовательнее к памяти больше чем на
+# threshold, выводятся как регрессии, и программа завершается с кодом 1.
+
+import argparse
+import collections
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from main import *
+
+
+_TYPES = ('int', 'float', 'str', 'bool', 'datetime')  # Типы значений, из которых составляются столбцы
+
+
+def generate_table(rows, columns, types=_TYPES, seed=0):
+    '''
+        Синтетическая таблица со строковыми значениями (как после загрузки из файла).
+        types - типы столбцов, повторяемые по кругу: столбец i имеет тип types[i % len(types)].
+        Одинаковые параметры и seed дают одинаковую таблицу.
+    '''
+
+    # Проверка параметров
+    if rows <= 0 or columns <= 0:
+        raise ValueError("Количество строк и столбцов должно быть положительным")
+    for col_type in types:
+        if col_type not in _TYPES:
+            raise ValueError(f"Неизвестный тип столбца '{col_type}'")
+
+    rnd = random.Random(seed)
+    col_types = [types[col_idx % len(types)] for col_idx in range(columns)]
+    header = [f"{col_type}_{col_idx + 1}" for col_idx, col_type in enumerate(col_types)]
+    start = datetime.datetime(2020, 1, 1)
+
+    def value(col_type):
+        if col_type == 'int':
+            return str(rnd.randrange(-10 ** 6, 10 ** 6))
+        elif col_type == 'float':
+            return repr(round(rnd.uniform(-1000, 1000), 3))
+        elif col_type == 'bool':
+            return rnd.choice(('true', 'false'))
+        elif col_type == 'datetime':
+            return (start + datetime.timedelta(seconds=rnd.randrange(10 ** 8))).isoformat()
+        # Префикс не даёт строке случайно совпасть со значением другого типа (nan, inf, true)
+        return 's' + ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rnd.randrange(3, 12)))
+
+    data = [header]
+    data.extend([value(col_type) for col_type in col_types] for _ in range(rows))
+    return data, dict(zip(range(1, columns + 1), col_types))
+
+
+def measure(func, repeat=3, setup=None):
+    '''
+        Лучшее время из repeat запусков и пик выделенной памяти (отдельный запуск под tracemalloc).
+        setup - функция подготовки, которая вызывается перед каждым запуском вне замера;
+        её результат передаётся в func (например, копия таблицы для операции, изменяющей таблицу на месте).
+    '''
+
+    def prepare():
+        table_cache_clear()  # Каждый запуск читает файлы заново, без кеша загруженных таблиц
+        return () if setup is None else (setup(),)
+
+    times = []
+    for _ in range(repeat):
+        args = prepare()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    args = prepare()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': min(times), 'peak_bytes': peak}
+
+
+def _consume(rows):
+    # Обход всех строк без сохранения (для ленивых представлений concat и split)
+    collections.deque(rows, maxlen=0)
+
+
+def benchmarks(data, types, directory, parts=4):
+    '''
+        Замеряемые операции: название -> функция без параметров или пара (подготовка, функция) для measure.
+        Файлы для загрузки записываются в directory заранее, их запись в замер не входит.
+    '''
+
+    rows = len(data) - 1
+    part_rows = max(rows // parts, 1)
+    files = {}
+    for fmt in ('.csv', '.txt', '.pkl', '.tbl'):
+        filename = os.path.join(directory, f"table{fmt}")
+        save_table(data, filename)
+        files[fmt] = filename
+        # Та же таблица в нескольких файлах для загрузки набора
+        save_table(data, os.path.join(directory, f"parts{fmt}"), max_rows=part_rows)
+
+    typed_file = files['.csv']
+    typed = set_column_types(typed_file, types)
+    half = rows // 2 or 1
+    column_values = get_values(typed, 1)
+
+    cases = {}
+    for fmt, filename in files.items():
+        cases[f"load_table{fmt}"] = lambda filename=filename: load_table(filename)
+        shards = [os.path.join(directory, f"parts_{i}{fmt}") for i in range(1, parts + 1)]
+        shards = [shard for shard in shards if os.path.isfile(shard)]
+        cases[f"load_table{fmt}[{len(shards)} files]"] = lambda shards=shards: load_table(*shards)
+
+        out = os.path.join(directory, f"out{fmt}")
+        cases[f"save_table{fmt}"] = lambda out=out: save_table(data, out)
+        cases[f"save_table{fmt}[max_rows]"] = lambda out=out: save_table(data, out, max_rows=part_rows)
+
+    cases['get_column_types'] = lambda: get_column_types(typed_file)
+    cases['set_column_types'] = lambda: set_column_types(typed_file, types)
+    cases['set_column_types[as_table]'] = lambda: set_column_types(typed_file, types, as_table=True)
+    cases['get_values'] = lambda: get_values(typed, 1)
+    cases['set_values'] = lambda: set_values(typed, column_values, 1)
+    # Копия таблицы, изменяемая на месте, готовится вне замера
+    cases['set_values[inplace]'] = (lambda: [list(line) for line in typed],
+                                    lambda copy: set_values(copy, column_values, 1, inplace=True))
+    # concat и split возвращают ленивые представления: отдельно замеряются обход и материализация их строк
+    cases['concat'] = lambda: concat(data, data)
+    cases['concat[iterate]'] = lambda: _consume(concat(data, data))
+    cases['concat[materialize]'] = lambda: concat(data, data).materialize()
+    cases[f"concat[{parts * 10} tables]"] = lambda: concat(*[data] * (parts * 10))
+    cases[f"concat[{parts * 10} tables, iterate]"] = lambda: _consume(concat(*[data] * (parts * 10)))
+    cases['split'] = lambda: split(data, half)
+    cases['split[iterate]'] = lambda: [_consume(part) for part in split(data, half)]
+    cases['split[materialize]'] = lambda: [part.materialize() for part in split(data, half)]
+    cases['print_table'] = lambda: print_table(data, file=io.StringIO())
+    cases['print_table[max_rows]'] = lambda: print_table(data, max_rows=20, file=io.StringIO())
+    return cases
+
+
+def run(rows, columns, types=_TYPES, repeat=3, only=None, seed=0):
+    # Запуск всех (или выбранных) замеров, результат - словарь для сохранения в JSON
+    data, column_types = generate_table(rows, columns, types, seed)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='lab3_benchmark_') as directory:
+        for name, case in benchmarks(data, column_types, directory).items():
+            if only and not any(part in name for part in only):
+                continue
+            setup, func = case if isinstance(case, tuple) else (None, case)
+            results[name] = measure(func, repeat, setup)
+            print(f"{name:<32} {results[name]['seconds']:10.4f} с {results[name]['peak_bytes'] / 2 ** 20:10.1f} МБ",
+                  flush=True)
+
+    return {
+        'meta': {
+            'rows': rows,
+            'columns': columns,
+            'types': list(types),
+            'repeat': repeat,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+
+_NOISE_SECONDS = 0.001  # Операции быстрее этого времени не сравниваются по времени (погрешность замера)
+
+
+def compare(results, baseline, threshold=0.2):
+    '''
+        Сравнение результатов с базовыми: список регрессий (операция, показатель, было, стало),
+        в которых показатель вырос больше чем на threshold (доля, 0.2 = 20%).
+    '''
+
+    # Проверка сопоставимости замеров
+    for key in ('rows', 'columns', 'types'):
+        if results['meta'].get(key) != baseline['meta'].get(key):
+            raise ValueError(f"Базовые результаты получены с другим параметром {key}: "
+                             f"{baseline['meta'].get(key)} вместо {results['meta'].get(key)}")
+
+    regressions = []
+    for name, current in results['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if metric == 'seconds' and current[metric] < _NOISE_SECONDS:
+                continue
+            if previous[metric] > 0 and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append((name, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры скорости и памяти функций lab3/main.py")
+    parser.add_argument('--rows', type=int, default=100_000, help="количество строк таблицы")
+    parser.add_argument('--columns', type=int, default=10, help="количество столбцов таблицы")
+    parser.add_argument('--types', default=','.join(_TYPES), help="типы столбцов через запятую (по кругу)")
+    parser.add_argument('--repeat', type=int, default=3, help="количество запусков для замера времени")
+    parser.add_argument('--seed', type=int, default=0, help="начальное значение генератора таблицы")
+    parser.add_argument('--only', action='append', help="замерять только операции, содержащие эту строку")
+    parser.add_argument('--output', help="файл JSON для сохранения результатов")
+    parser.add_argument('--baseline', help="файл JSON с базовыми результатами для сравнения")
+    parser.add_argument('--threshold', type=float, default=0.2, help="допустимое ухудшение (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.columns, tuple(args.types.split(',')), args.repeat, args.only, args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, previous, current in regressions:
+            print(f"Регрессия: {name} {metric}: {previous:.4g} -> {current:.4g} (x{current / previous:.2f})")
+        if regressions:
+            return 1
+        print("Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,211 +1,1656 @@
 # pip install tabulate
 
+import bisect
+import bz2
+import collections
+import contextlib
 import csv
+import functools
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
+import json
+import lzma
+import mmap
+import operator
 import pickle
 import os
-from tabulate import *
+import queue
+import random
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+import weakref
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import datetime
 
 
-def load_table(*filenames, fmt=None, detect_types=False):
+_FORMATS = ('.csv', '.pkl', '.txt', '.tbl')  # Поддерживаемые форматы файлов
+
+
+# Инструментирование вызовов
+
+_instrumentation = None  # Включённый сборщик Instrumentation (None - инструментирование выключено)
+
+
+class Instrumentation:
+    '''
+        Сборщик данных о вызовах функций модуля: время, строки и байты, приведённые значения, скопированные строки
+        и (при trace_memory=True) пик памяти, выделенной во время вызова. Включается через instrument():
+
+            with instrument() as stats:
+                data = load_table('data.csv')
+                typed = set_column_types('data.csv', {1: 'int'})
+            print_table(stats.summary())
+
+        callback - функция, которая получает запись (словарь) о каждом завершённом вызове.
+        Записи вызовов - stats.records, итог по операциям - stats.summary(), журнал JSON Lines - stats.write_log(file).
+    '''
+
+    COUNTERS = ('rows', 'bytes', 'cells_cast', 'rows_copied')
+
+    def __init__(self, callback=None, trace_memory=False):
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.records = []
+        self._local = threading.local()  # Стек вызовов каждого потока (для вложенных вызовов)
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def call(self, operation, func, args, kwargs):
+        # Вызов функции с записью времени, счётчиков и пика памяти
+        stack = self._stack()
+        record = {'operation': operation, 'depth': len(stack), 'seconds': 0.0}
+        record.update(dict.fromkeys(self.COUNTERS, 0))
+        # Пик памяти измеряется только для внешних вызовов: сброс пика во вложенном вызове исказил бы внешний
+        measure_memory = self.trace_memory and not stack and tracemalloc.is_tracing()
+        if measure_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except BaseException as error:
+            record['error'] = f"{type(error).__name__}: {error}"
+            raise
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            if measure_memory:
+                record['peak_bytes'] = tracemalloc.get_traced_memory()[1] - memory_before
+            stack.pop()
+            with self._lock:
+                self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def count(self, **counters):
+        # Добавление значений счётчиков к текущему вызову
+        stack = self._stack()
+        if stack:
+            record = stack[-1]
+            for name, value in counters.items():
+                record[name] += value
+
+    def summary(self):
+        # Итог по операциям в виде таблицы (список строк с заголовком, подходит для print_table)
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['operation'],
+                                      dict.fromkeys(('calls', 'seconds', 'peak_bytes') + self.COUNTERS, 0))
+            total['calls'] += 1
+            total['seconds'] += record['seconds']
+            total['peak_bytes'] = max(total['peak_bytes'], record.get('peak_bytes', 0))
+            for name in self.COUNTERS:
+                total[name] += record[name]
+
+        header = ['Операция', 'Вызовы', 'Время, с', 'Строки', 'Байты', 'Приведено значений', 'Скопировано строк',
+                  'Пик памяти, байт']
+        data = [header]
+        for operation, total in sorted(totals.items(), key=lambda item: -item[1]['seconds']):
+            data.append([operation, total['calls'], round(total['seconds'], 6), total['rows'], total['bytes'],
+                         total['cells_cast'], total['rows_copied'], total['peak_bytes']])
+        return data
+
+    def write_log(self, file):
+        # Записи вызовов в формате JSON Lines (файл или открытый текстовый поток)
+        if isinstance(file, str):
+            with open(file, 'w', encoding='utf-8') as f:
+                self.write_log(f)
+            return
+        for record in self.records:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+@contextlib.contextmanager
+def instrument(callback=None, trace_memory=False):
+    '''
+        Включение инструментирования на время блока with; возвращает сборщик Instrumentation.
+        trace_memory=True - измерение пика памяти через tracemalloc (заметно замедляет работу).
+    '''
+
+    global _instrumentation
+    previous = _instrumentation
+    collector = Instrumentation(callback, trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _instrumentation = collector
+    try:
+        yield collector
+    finally:
+        _instrumentation = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def _instrumented(func):
+    # Декоратор функций, вызовы которых записываются при включённом инструментировании
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _instrumentation is None:
+            return func(*args, **kwargs)
+        return _instrumentation.call(func.__name__, func, args, kwargs)
+    return wrapper
+
+
+def _count(**counters):
+    # Счётчики текущего вызова (при выключенном инструментировании ничего не делает)
+    if _instrumentation is not None:
+        _instrumentation.count(**counters)
+
+
+def iter_table(*filenames, fmt=None, columns=None, where=None, delimiter=None):
+    '''
+        Ленивая загрузка таблицы из одного или нескольких файлов.
+        Функция возвращает итератор: первым элементом выдаётся заголовок, затем строки всех файлов по одной.
+        Проверки заголовков и количества столбцов выполняются для каждой строки по мере чтения,
+        поэтому расход памяти не зависит от размера файлов.
+        columns - список столбцов (номера или названия), которые нужно оставить.
+        where - условие (столбец, операция, значение) или список условий, по которым отбираются строки.
+        delimiter - разделитель столбцов .csv; если не задан, определяется по началу каждого файла.
+        Вместо имени файла можно передать открытый текстовый поток .csv или .txt (например, sys.stdin),
+        он читается по мере разбора строк; формат потока задаётся параметром fmt.
+    '''
+
+    filenames, fmt = _check_files(filenames, fmt, text_streams=True)
+    return _iter_rows(filenames, fmt, columns, where, delimiter)
+
+
+def _check_files(filenames, fmt, text_streams=False):
     # Проверка указания файла
     if not filenames:
         raise ValueError("Не указаны файлы для загрузки")
 
+    # Открытые текстовые потоки принимает только iter_table
+    streams = [filename for filename in filenames if _is_text_file(filename)]
+    if streams and not text_streams:
+        raise ValueError("Текстовые потоки читаются только через iter_table")
+
+    # Манифест (base_manifest.json) заменяется списком файлов набора
+    filenames = _expand_manifests(filenames)
+
     # Проверка существования файла
     for filename in filenames:
-        if not os.path.isfile(filename):
+        if not _is_text_file(filename) and not os.path.isfile(filename):
             raise FileNotFoundError("Файла с таким названием не существует")
 
-    # Определение формата по первому файлу, если не задан
+    # Определение формата по первому файлу, если не задан (у сжатых файлов - по расширению перед .gz, .bz2, .xz, .zst)
     if fmt is None:
-        _, ext = os.path.splitext(filenames[0])
-        if ext.lower() in ('.csv', '.pkl', '.txt'):
+        if _is_text_file(filenames[0]):
+            raise ValueError("Для чтения из потока укажите формат fmt: .csv или .txt")
+        _, ext = os.path.splitext(_split_compression(filenames[0])[0])
+        if ext.lower() in _FORMATS:
             fmt = ext.lower()
         else:
-            raise ValueError("Неизвестный формат файла. Используйте расширения .csv, .pkl или .txt")
+            raise ValueError("Неизвестный формат файла. Используйте расширения .csv, .pkl, .txt или .tbl")
 
-    all_data = []
-    header = None  # Сохранение заголовока (подразумевается, что заголовок есть в каждой таблице)
-    reference_width = None  # Число столбцов в первой таблице
+    # Проверка формата потоков
+    if streams and fmt not in ('.csv', '.txt'):
+        raise ValueError("Из текстового потока читаются только форматы .csv и .txt")
 
     # Проверка файлов на одинаковость формата
     for filename in filenames:
-        _, ext = os.path.splitext(filename)
+        if _is_text_file(filename):
+            continue
+        name, compression = _split_compression(filename)
+        _, ext = os.path.splitext(name)
         if fmt != ext.lower():
             raise ValueError("Все файлы должны быть одного формата")
+        # Проверка возможности сжатия
+        if compression is not None and fmt == '.tbl':
+            raise ValueError("Файлы .tbl читаются через mmap и не могут быть сжаты")
 
-        # Загрузка данных из файлов
-        data = []
-        if fmt == '.csv':
-            with open(filename, 'r', newline='', encoding='utf-8') as f:
-                reader = list(csv.reader(f))
-                # data = reader (Если строки в Excel таблице не слепляются в одну ячейку с delimiter=',', а с delimiter=';' слепляются, то использовать эту строчку).
-                # Закоментировать цикл ниже (отметил строчки знаком #), если с delimiter=';' строки в Excel таблице слепляются в одну ячейку. В функции save_table заменить значение delimiter на ',' (подписал, где это нужно сделать).
-                # data.extend(el.split(';') for el in line for line in reader)
-                for line in reader:  #
-                    for el in line:  #
-                        new_el = el.split(';')  #
-                        data.append(new_el)  #
-        elif fmt == '.pkl':
-            with open(filename, 'rb') as f:
-                data = pickle.load(f)
-        elif fmt == '.txt':
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            data = [line.strip().split('\t') for line in lines if line.strip()]
-
-        # Проверкамналичия данных в файлах
-        if not data:
-            raise ValueError(f"Файл {filename} пустой")
+    return filenames, fmt
+
+
+def _iter_rows(filenames, fmt, columns=None, where=None, delimiter=None):
+    header = None  # Сохранение заголовока (подразумевается, что заголовок есть в каждой таблице)
+    reference_width = None  # Число столбцов в первой таблице
+    selection = None  # Отбор столбцов и строк, если он задан
+    max_split = _txt_max_split(filenames[0], fmt, columns, where)
+
+    for filename in filenames:
+        rows = _iter_file_rows(filename, fmt, max_split, delimiter)
 
-        current_header = data[0]  # Заголовок первого файла
-        body = data[1:]  # Остальные строки
+        # Проверка наличия данных в файлах
+        current_header = next(rows, None)
+        if current_header is None:
+            raise ValueError(f"Файл {filename} пустой")
 
-        # Заполнение списка данными из файлов
         if header is None:
             header = current_header
             reference_width = len(header)
-            # Проверка строк в первом файле
-            for line in body:
+            if columns is not None or where:
+                selection = _Selection(header, columns, where)
+            yield header if selection is None else selection.header
+        # Проверка на совпадение заголовков в оставшихся файлах
+        elif current_header != header:
+            raise ValueError(f"Заголовок в файле {filename} не совпадает с заголовками предыдущих файлов")
+
+        # Проверка строк файла
+        if selection is None:
+            for line in rows:
                 if len(line) != reference_width:
                     raise ValueError(f"Некорректная структура столбцов в файле {filename}")
-            all_data.append(header)
-            all_data.extend(body)
+                yield line
         else:
-            # Проверка на совпадение заголовков в оставшихся файлах
-            if current_header != header:
-                raise ValueError(f"Заголовок в файле {filename} не совпадает с заголовками предыдущих файлов")
-            # Проверка строк в оставшихся файлах
-            for line in body:
-                if len(line) != reference_width:
+            # Строки, не прошедшие отбор, не сохраняются, а от оставшихся берутся только нужные столбцы
+            for line in rows:
+                if _row_width(line, max_split) != reference_width:
                     raise ValueError(f"Некорректная структура столбцов в файле {filename}")
-            all_data.extend(body)
+                if selection.matches(line):
+                    yield selection.project(line)
+
+
+def _txt_max_split(filename, fmt, columns, where):
+    # В .txt строка разбивается только до последнего нужного столбца (остаток строки не делится)
+    if fmt != '.txt' or (columns is None and not where) or _is_text_file(filename):
+        return -1
+    header = next(_iter_file_rows(filename, fmt), None)
+    if header is None:
+        return -1
+    return _Selection(header, columns, where).max_split
+
+
+def _row_width(line, max_split):
+    # Количество столбцов строки .txt, разобранной не до конца: в последней части остались неразделённые столбцы
+    if max_split < 0:
+        return len(line)
+    return len(line) + line[-1].count('\t')
+
+
+def _iter_file_rows(filename, fmt, max_split=-1, delimiter=None):
+    # Построчное чтение одного файла
+    if _is_text_file(filename):
+        yield from _iter_stream_rows(filename, fmt, max_split, delimiter)
+    elif fmt == '.tbl':
+        yield from _read_tbl(filename)
+    elif fmt == '.pkl':
+        yield from _read_pkl(filename)
+    else:
+        dialect = _csv_dialect(filename, delimiter) if fmt == '.csv' else None
+        with _open_input(filename, 'r', newline='' if fmt == '.csv' else None, encoding='utf-8') as f:
+            yield from _iter_text_rows(f, fmt, max_split, dialect=dialect)
+
+
+def _iter_stream_rows(f, fmt, max_split=-1, delimiter=None):
+    # Разбор открытого текстового потока; диалект .csv определяется по началу потока, как у файла
+    dialect = None
+    if fmt == '.csv':
+        if delimiter is not None:
+            dialect = _delimiter_dialect(delimiter)
+        else:
+            sample = f.read(_CSV_SNIFF_BYTES)
+            complete = len(sample) < _CSV_SNIFF_BYTES
+            dialect = _sniff_csv_dialect(sample, complete)
+            # Прочитанное начало разбирается перед остатком потока (оборванная строка дочитывается)
+            f = itertools.chain(io.StringIO(sample if complete else sample + f.readline(), newline=''), f)
+    yield from _iter_text_rows(f, fmt, max_split, dialect=dialect)
+
+
+def _is_text_file(filename):
+    # Открытый текстовый поток (sys.stdin, sys.stdout, io.StringIO) вместо имени файла
+    return hasattr(filename, 'read') or hasattr(filename, 'write')
+
+
+_READ_AHEAD_BYTES = 1024 * 1024  # Размер блока, распаковываемого фоновым потоком
+_READ_AHEAD_BLOCKS = 8  # Количество распакованных блоков, ожидающих разбора
+
+
+def _open_input(filename, mode, **kwargs):
+    '''
+        Открытие файла таблицы для чтения. Сжатые файлы (.gz, .bz2, .xz, .zst) распаковываются потоково
+        в фоновом потоке блоками по _READ_AHEAD_BYTES, пока основной поток разбирает уже распакованные строки.
+    '''
+
+    compression = _split_compression(filename)[1]
+    if compression is None:
+        return open(filename, mode, **kwargs)
+
+    raw = _ReadAhead(_open_file(filename, 'rb', compression), filename, compression)
+    buffered = io.BufferedReader(raw, _READ_AHEAD_BYTES)
+    if 'b' in mode:
+        return buffered
+    return io.TextIOWrapper(buffered, **kwargs)
+
+
+class _ReadAhead(io.RawIOBase):
+    '''
+        Чтение файла (распаковка сжатого) в фоновом потоке с ограниченной очередью блоков.
+        Ошибки чтения передаются через очередь и возникают в потоке, который читает данные;
+        ошибки распаковки повреждённого файла заменяются на ValueError.
+    '''
+
+    def __init__(self, f, filename, compression=None):
+        super().__init__()
+        self._file = f
+        self._filename = filename
+        # Ошибки повреждённых данных: gzip - zlib.error, bz2 - OSError, xz - LZMAError, zstd - ZstdError
+        self._errors = (EOFError, OSError, zlib.error, lzma.LZMAError)
+        if compression == 'zstd':
+            self._errors += (_zstd_module().ZstdError,)
+        self._blocks = queue.Queue(_READ_AHEAD_BLOCKS)
+        self._stop = threading.Event()
+        self._block = b''
+        self._position = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                block = self._file.read(_READ_AHEAD_BYTES)
+                self._put(block)
+                if not block:
+                    break
+        except BaseException as error:
+            if isinstance(error, self._errors):
+                error = ValueError(f"Файл {self._filename} повреждён: {error}")
+            self._put(error)
+        finally:
+            self._file.close()
+
+    def _put(self, item):
+        # Ожидание места в очереди, пока чтение не остановлено закрытием файла
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._position >= len(self._block):
+            if self._eof:
+                return 0
+            item = self._blocks.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._block = item
+            self._position = 0
+
+        size = min(len(buffer), len(self._block) - self._position)
+        buffer[:size] = self._block[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+        super().close()
+
+
+def _iter_text_rows(f, fmt, max_split=-1, with_header=True, dialect=None):
+    # Разбор строк текстового файла (или любого текстового потока) формата .csv или .txt
+    if fmt == '.csv':
+        # Каждая строка разбирается один раз по диалекту файла, пустые строки пропускаются
+        for line in csv.reader(f, **(dialect or {'delimiter': _CSV_DELIMITER})):
+            if line:
+                yield line
+    elif fmt == '.txt':
+        # Заголовок всегда разбирается полностью, остальные строки - не больше чем на max_split частей
+        split_limit = -1 if with_header else max_split
+        for line in f:
+            if line.strip():
+                yield line.strip().split('\t', split_limit)
+                split_limit = max_split
+
+
+_CSV_DELIMITER = ';'  # Разделитель столбцов при записи .csv (и при чтении, если его не удалось определить)
+_CSV_DELIMITERS = (';', ',', '\t', '|')  # Разделители, среди которых выбирается разделитель файла
+_CSV_QUOTECHARS = ('"', "'")  # Символы кавычек, среди которых выбираются кавычки файла
+_CSV_SNIFF_BYTES = 64 * 1024  # Размер начала файла, по которому определяется диалект
+_CSV_SNIFF_ROWS = 50  # Количество записей начала файла, по которым определяется диалект
+_csv_dialect_cache = {}  # Диалекты файлов: путь -> (время изменения, размер, диалект)
+
+
+def _csv_dialect(filename, delimiter=None):
+    '''
+        Параметры csv.reader для файла .csv: разделитель и символ кавычек.
+        Если разделитель не задан, диалект определяется один раз по началу файла
+        и запоминается до изменения файла.
+    '''
+
+    if delimiter is not None:
+        return _delimiter_dialect(delimiter)
+
+    stat = os.stat(filename)
+    key = os.path.abspath(filename)
+    cached = _csv_dialect_cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with _open_input(filename, 'rb') as f:
+        sample = f.read(_CSV_SNIFF_BYTES)
+    dialect = _sniff_csv_dialect(sample.decode('utf-8', errors='ignore'), complete=len(sample) < _CSV_SNIFF_BYTES)
+
+    _csv_dialect_cache[key] = (stat.st_mtime_ns, stat.st_size, dialect)
+    return dialect
+
+
+def _source_delimiter(filename):
+    # Разделитель исходного файла .csv, чтобы перезаписанный файл сохранил его диалект
+    if os.path.splitext(_split_compression(filename)[0])[1].lower() != '.csv':
+        return None
+    return _csv_dialect(filename)['delimiter']
+
+
+def _delimiter_dialect(delimiter):
+    # Проверка разделителя, заданного явно
+    if not isinstance(delimiter, str) or len(delimiter) != 1:
+        raise ValueError(f"Разделитель {delimiter!r} должен быть одним символом")
+    return {'delimiter': delimiter}
+
+
+def _sniff_csv_dialect(sample, complete=True):
+    # Выбор диалекта, при котором записи начала файла имеют одинаковое (и наибольшее) количество столбцов
+    best = None
+    best_width = 1
+    fallback = None
+    fallback_width = 1
+    for quotechar in _CSV_QUOTECHARS:
+        for delimiter in _CSV_DELIMITERS:
+            dialect = {'delimiter': delimiter, 'quotechar': quotechar}
+            try:
+                lines = [line for line in itertools.islice(csv.reader(io.StringIO(sample, newline=''), **dialect),
+                                                           _CSV_SNIFF_ROWS + 1) if line]
+            except csv.Error:
+                continue
+            # Последняя запись может быть обрезана границей начала файла
+            if not complete and len(lines) > 1:
+                lines.pop()
+            if not lines:
+                continue
+            widths = {len(line) for line in lines}
+            if len(widths) == 1 and len(lines[0]) > best_width:
+                best, best_width = dialect, len(lines[0])
+            elif len(lines[0]) > fallback_width:
+                fallback, fallback_width = dialect, len(lines[0])
+
+    # Если ни при одном диалекте записи не согласованы, выбирается диалект с наибольшим числом столбцов заголовка
+    return best or fallback or {'delimiter': _CSV_DELIMITER, 'quotechar': '"'}
+
+
+@_instrumented
+def load_table(*filenames, fmt=None, detect_types=False, type_sample=None, workers=None, columns=None, where=None,
+               delimiter=None, since_offset=None):
+    # Проверка корректности количества процессов, если оно задано
+    if workers is not None and workers <= 0:
+        raise ValueError(f"Параметр workers = {workers} может быть только положительным")
+
+    filenames, fmt = _check_files(filenames, fmt)
+    new_offset = None
+    if since_offset is not None:
+        # Только строки, дописанные в файл после запомненного смещения
+        all_data, new_offset = _load_since(filenames, fmt, since_offset, columns, where, delimiter)
+    elif fmt == '.tbl':
+        # Файлы .tbl открываются через mmap, столбцы таблицы - представления частей файла без копирования
+        all_data = _load_tbl_files(filenames)
+        if columns is not None or where:
+            all_data = _select_table(all_data, _Selection(all_data.header, columns, where))
+    elif fmt == '.pkl' and not any(_is_text_file(filename) for filename in filenames):
+        # Файлы .pkl, записанные из таблиц Table, загружаются столбцами без сборки строк, остальные - списком строк.
+        # Процессы здесь не нужны: строки, загруженные в процессе, пришлось бы снова передавать через pickle
+        all_data = _load_pkl_files(filenames, columns, where)
+    elif workers is not None and workers > 1:
+        # Файлы (и части больших файлов) разбираются параллельно в нескольких процессах
+        all_data = _load_parallel(filenames, fmt, workers, columns, where, delimiter)
+    else:
+        # Загрузка всех строк через ленивый итератор (проверки выполняются в iter_table)
+        all_data = list(_iter_rows(filenames, fmt, columns, where, delimiter))
+
+    _count(rows=len(all_data) - 1)
+    if _instrumentation is not None:
+        _count(bytes=sum(os.path.getsize(filename) for filename in filenames))
 
     # Определение типа столбцов по надобности
     if detect_types:
-        column_types = detect_column_types(all_data)
+        column_types = detect_column_types(all_data, sample=type_sample)
+        if since_offset is not None:
+            return all_data, column_types, new_offset
         return all_data, column_types
 
+    if since_offset is not None:
+        return all_data, new_offset
+    return all_data
+
+
+def _load_since(filenames, fmt, since_offset, columns=None, where=None, delimiter=None):
+    '''
+        Загрузка строк, дописанных в файл .csv или .txt после смещения since_offset (в байтах).
+        Возвращает таблицу (заголовок и новые строки) и смещение, с которого нужно читать в следующий раз.
+        Незаконченная последняя строка (запись ещё идёт) не читается и войдёт в следующую загрузку.
+        Смещение 0 - все строки файла.
+    '''
+
+    # Проверка параметров
+    if len(filenames) != 1:
+        raise ValueError("Параметр since_offset используется только с одним файлом")
+    if fmt not in ('.csv', '.txt'):
+        raise ValueError("Параметр since_offset поддерживается только для файлов .csv и .txt")
+
+    filename = filenames[0]
+    if _split_compression(filename)[1] is not None:
+        raise ValueError("Параметр since_offset не поддерживается для сжатых файлов")
+    size = os.path.getsize(filename)
+    if not isinstance(since_offset, int) or since_offset < 0 or since_offset > size:
+        raise ValueError(f"Смещение {since_offset} вне файла {filename} (размер {size} байт)")
+
+    header = next(_iter_file_rows(filename, fmt, delimiter=delimiter), None)
+    # Проверка наличия данных в файле
+    if header is None:
+        raise ValueError(f"Файл {filename} пустой")
+    selection = _Selection(header, columns, where) if columns is not None or where else None
+
+    # Записи .csv ищутся тем же csv.reader, что разбирает файл: перевод строки внутри кавычек не заканчивает запись
+    dialect = _csv_dialect(filename, delimiter) if fmt == '.csv' else None
+    with open(filename, 'rb') as f:
+        start = max(since_offset, _header_end(f, dialect))
+        # Смещение должно указывать на начало строки
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b'\n':
+                raise ValueError(f"Смещение {since_offset} не совпадает с началом строки файла {filename}")
+        stop = _last_line_end(f, start, size, dialect)
+
+    rows = _parse_byte_range(filename, fmt, start, stop, len(header), selection, delimiter) if stop > start else []
+    return [header if selection is None else selection.header] + rows, stop
+
+
+def _csv_records(lines, dialect):
+    # Записи csv.reader и признак законченности: запись, разобранная после того, как строки закончились,
+    # обрезана концом данных (кавычки не закрыты)
+    exhausted = False
+
+    def feed():
+        nonlocal exhausted
+        yield from lines
+        exhausted = True
+
+    for record in csv.reader(feed(), **dialect):
+        yield record, not exhausted
+
+
+def _csv_record_ends(f, start, size, dialect):
+    # Смещения концов законченных записей .csv в диапазоне start..size и сами записи
+    position = start
+
+    def lines():
+        nonlocal position
+        f.seek(start)
+        for line in f:
+            # Строки, дописанные после определения размера файла, и недописанная последняя строка не читаются
+            if position + len(line) > size or not line.endswith(b'\n'):
+                return
+            position += len(line)
+            yield line.decode('utf-8')
+
+    for record, finished in _csv_records(lines(), dialect):
+        if not finished:
+            return
+        yield position, record
+
+
+def _header_end(f, dialect=None):
+    # Смещение конца первой записи (заголовка) файла
+    if dialect is not None:
+        f.seek(0, os.SEEK_END)
+        for end, record in _csv_record_ends(f, 0, f.tell(), dialect):
+            if record:
+                return end
+        return f.tell()
+
+    f.seek(0)
+    for line in f:
+        if line.strip():
+            return f.tell()
+    return f.tell()
+
+
+def _last_line_end(f, start, size, dialect=None):
+    # Смещение конца последней законченной записи в диапазоне start..size
+    if dialect is not None:
+        stop = start
+        for stop, _ in _csv_record_ends(f, start, size, dialect):
+            pass
+        return stop
+
+    # В .txt запись - строка файла: поиск последнего перевода строки блоками с конца
+    position = size
+    while position > start:
+        block_start = max(start, position - 64 * 1024)
+        f.seek(block_start)
+        block = f.read(position - block_start)
+        newline = block.rfind(b'\n')
+        if newline >= 0:
+            return block_start + newline + 1
+        position = block_start
+    return start
+
+
+# Отбор столбцов и строк при загрузке
+
+def _op_in(value, values):
+    return value in values
+
+
+def _op_not_in(value, values):
+    return value not in values
+
+
+_WHERE_OPS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': _op_in,
+    'not in': _op_not_in,
+}
+
+
+def _cast_bool(value):
+    return value.strip().lower() in ('true', '1', 'yes', 'да')
+
+
+def _where_cast(value):
+    # Приведение текстового значения ячейки к типу значения из условия
+    return {int: int, float: float, bool: _cast_bool, datetime.datetime: _parse_datetime}.get(type(value))
+
+
+class _Selection:
+    '''
+        Отбор столбцов (columns) и строк (where) при чтении файла.
+        where - условие (столбец, операция, значение) или список условий, которые должны выполняться одновременно.
+        Значение ячейки приводится к типу значения из условия, например ('age', '>=', 18) сравнивает числа.
+    '''
+
+    def __init__(self, header, columns=None, where=None):
+        if columns is not None:
+            # Проверка наличия столбцов
+            if not columns:
+                raise ValueError("Не указаны столбцы для загрузки")
+            self.indices = [_column_index(header, column) for column in columns]
+            self.header = [header[col_idx] for col_idx in self.indices]
+        else:
+            self.indices = None
+            self.header = list(header)
+
+        # Одно условие можно передать без списка
+        if isinstance(where, tuple) and len(where) == 3 and where[1] in _WHERE_OPS:
+            where = [where]
+
+        self.conditions = []
+        for condition in where or ():
+            # Проверка условия на корректность
+            if len(condition) != 3:
+                raise ValueError(f"Условие {condition} должно состоять из столбца, операции и значения")
+            column, op, value = condition
+            if op not in _WHERE_OPS:
+                raise ValueError(f"Неизвестная операция сравнения '{op}'")
+
+            if op in ('in', 'not in'):
+                value = frozenset(value)
+                sample_value = next(iter(value), None)
+            else:
+                sample_value = value
+            cast = _where_cast(sample_value)
+            self.conditions.append((_column_index(header, column), _WHERE_OPS[op], value, cast))
+
+        # Если выбраны не все столбцы, строку достаточно разделить до последнего используемого столбца
+        used = (self.indices or []) + [condition[0] for condition in self.conditions]
+        self.max_split = max(used) + 1 if self.indices is not None else -1
+
+    def matches(self, line):
+        for col_idx, op, value, cast in self.conditions:
+            if not _check_condition(line[col_idx], op, value, cast):
+                return False
+        return True
+
+    def project(self, line):
+        if self.indices is None:
+            return line
+        return [line[col_idx] for col_idx in self.indices]
+
+
+def _check_condition(cell, op, value, cast):
+    # Значение, которое нельзя привести к типу условия, условию не соответствует
+    if cast is not None and isinstance(cell, str):
+        try:
+            cell = cast(cell)
+        except ValueError:
+            return False
+    try:
+        return op(cell, value)
+    except TypeError:
+        return False
+
+
+def _select_table(table, selection):
+    # Отбор в колоночной таблице: выбранные столбцы не копируются, условия проверяются только по своим столбцам
+    columns = table.columns if selection.indices is None else [table.columns[i] for i in selection.indices]
+    if not selection.conditions:
+        return Table(selection.header, columns)
+
+    keep = None
+    for col_idx, op, value, cast in selection.conditions:
+        matched = [_check_condition(cell, op, value, cast) for cell in table.columns[col_idx]]
+        keep = matched if keep is None else [a and b for a, b in zip(keep, matched)]
+    rows = [row_idx for row_idx, matched in enumerate(keep) if matched]
+
+    return Table(selection.header, [Column(column.type, (column[row_idx] for row_idx in rows)) for column in columns])
+
+
+# Параллельная загрузка
+
+_PARALLEL_CHUNK_BYTES = 64 * 1024 * 1024  # Файлы .csv и .txt больше этого размера делятся на части по строкам
+
+
+def _load_parallel(filenames, fmt, workers, columns=None, where=None, delimiter=None):
+    all_data = []
+    header = None  # Сохранение заголовока (подразумевается, что заголовок есть в каждой таблице)
+
+    # Отбор столбцов и строк выполняется в процессах (файлы .pkl загружаются без процессов, в _load_pkl_files)
+    selection = None
+    if columns is not None or where:
+        first_header = next(_iter_file_rows(filenames[0], fmt, delimiter=delimiter), None)
+        if first_header is not None:
+            selection = _Selection(first_header, columns, where)
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Задачи ставятся сразу для всех файлов, результаты объединяются в порядке файлов
+        tasks = []
+        for filename in filenames:
+            ranges = _split_byte_ranges(filename, fmt)
+            if ranges is None:
+                tasks.append((filename, [pool.submit(_parse_byte_range, filename, fmt, selection=selection,
+                                                     delimiter=delimiter)]))
+                continue
+            # Количество столбцов для проверки частей файла без заголовка
+            width = len(next(_iter_file_rows(filename, fmt, delimiter=delimiter)))
+            tasks.append((filename, [pool.submit(_parse_byte_range, filename, fmt, start, stop, width, selection,
+                                                 delimiter)
+                                     for start, stop in ranges]))
+
+        for filename, futures in tasks:
+            try:
+                parts = [future.result() for future in futures]
+            except _RecordSplitError:
+                # Части начинаются с начала записей, только если каждая часть закончилась ровно на границе записи
+                parts = [_parse_byte_range(filename, fmt, selection=selection, delimiter=delimiter)]
+            rows = parts[0]
+
+            # Проверка наличия данных в файлах
+            if not rows:
+                raise ValueError(f"Файл {filename} пустой")
+
+            current_header = rows[0]
+            if header is None:
+                header = current_header
+                all_data.append(header if selection is None else selection.header)
+            # Проверка на совпадение заголовков в оставшихся файлах
+            elif current_header != header:
+                raise ValueError(f"Заголовок в файле {filename} не совпадает с заголовками предыдущих файлов")
+
+            all_data.extend(itertools.islice(rows, 1, None))
+            for part in parts[1:]:
+                all_data.extend(part)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
     return all_data
 
 
-def save_table(data, filename, fmt=None, max_rows=None):
+class _RecordSplitError(ValueError):
+    # Граница части .csv, найденная по чётности кавычек, не совпала с началом записи
+    pass
+
+
+def _split_byte_ranges(filename, fmt):
+    # Деление большого файла на диапазоны байтов, границы которых совпадают с началом записи
+    # Сжатый файл нельзя читать с произвольного места, он разбирается целиком в одном процессе
+    size = os.path.getsize(filename)
+    if fmt not in ('.csv', '.txt') or size <= _PARALLEL_CHUNK_BYTES or _split_compression(filename)[1] is not None:
+        return None
+
+    boundaries = [0]
+    # В .csv перевод строки может быть внутри кавычек. Границы ищутся по чётности кавычек без разбора записей,
+    # а процесс каждой части проверяет, что его часть закончилась на границе записи (_parse_byte_range)
+    quotechar = _csv_dialect(filename).get('quotechar', '"').encode() if fmt == '.csv' else None
+    with open(filename, 'rb') as f:
+        for target in range(_PARALLEL_CHUNK_BYTES, size, _PARALLEL_CHUNK_BYTES):
+            if target <= boundaries[-1]:
+                continue
+            in_quotes = False
+            if quotechar is not None:
+                # Предыдущая граница - начало записи, поэтому чётность количества кавычек от неё до target
+                # показывает, находится ли target внутри кавычек (кавычки считаются блоками, без разбора строк)
+                f.seek(boundaries[-1])
+                quotes = 0
+                remaining = target - boundaries[-1]
+                while remaining > 0:
+                    block = f.read(min(remaining, _READ_AHEAD_BYTES))
+                    quotes += block.count(quotechar)
+                    remaining -= len(block)
+                in_quotes = quotes % 2 == 1
+            f.seek(target)
+            # Граница переносится на начало следующей записи
+            while True:
+                line = f.readline()
+                if quotechar is not None and line.count(quotechar) % 2:
+                    in_quotes = not in_quotes
+                if not line or not in_quotes:
+                    break
+            boundary = f.tell()
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+    if boundaries[-1] < size:
+        boundaries.append(size)
+
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _parse_byte_range(filename, fmt, start=None, stop=None, width=None, selection=None, delimiter=None):
+    # Разбор файла целиком или диапазона байтов start..stop (выполняется в отдельном процессе)
+    max_split = selection.max_split if selection is not None and fmt == '.txt' else -1
+    with_header = not start
+    if start is None:
+        rows = list(_iter_file_rows(filename, fmt, max_split, delimiter))
+    else:
+        with open(filename, 'rb') as f:
+            f.seek(start)
+            chunk = f.read(stop - start)
+        text = io.StringIO(chunk.decode('utf-8'), newline='' if fmt == '.csv' else None)
+        if fmt == '.csv' and stop < os.path.getsize(filename):
+            # Граница части найдена по чётности кавычек и может попасть внутрь записи, если в поле без кавычек
+            # встречается кавычка: запись, обрезанная концом части, означает, что файл нужно разобрать одним куском
+            rows = []
+            for line, finished in _csv_records(text, _csv_dialect(filename, delimiter)):
+                if not finished:
+                    raise _RecordSplitError(f"Граница части файла {filename} попала внутрь записи")
+                if line:
+                    rows.append(line)
+        else:
+            dialect = _csv_dialect(filename, delimiter) if fmt == '.csv' else None
+            rows = list(_iter_text_rows(text, fmt, max_split, with_header, dialect))
+
+    # Проверка строк: в начале файла первая строка - заголовок
+    if with_header and rows:
+        width = len(rows[0])
+    body = itertools.islice(rows, 1 if with_header else 0, None)
+    for line in body:
+        if _row_width(line, max_split) != width:
+            raise ValueError(f"Некорректная структура столбцов в файле {filename}")
+
+    # Отбор строк и столбцов (заголовок возвращается полностью для сравнения с другими файлами)
+    if selection is not None:
+        selected = rows[:1] if with_header else []
+        selected.extend(selection.project(line) for line in itertools.islice(rows, 1 if with_header else 0, None)
+                        if selection.matches(line))
+        rows = selected
+    return rows
+
+
+_MANIFEST_SUFFIX = '_manifest.json'  # Манифест набора файлов, записанного с max_rows
+
+
+@_instrumented
+def save_table(data, filename, fmt=None, max_rows=None, workers=None, use_processes=False, delimiter=None,
+               append=False, compression=None):
+    '''
+        Сохранение таблицы (или потока строк) в файл формата .csv, .pkl, .txt или .tbl.
+        Файл записывается атомарно: сначала во временный файл, который после fsync заменяет целевой.
+        max_rows - запись в несколько файлов по max_rows строк и манифест набора.
+        append=True - дозапись строк в конец существующего файла .csv или .txt.
+        compression - потоковое сжатие 'gzip', 'bz2', 'xz' или 'zstd' (к имени файла добавляется .gz, .bz2, .xz или .zst);
+        также определяется по составному расширению имени файла (data.csv.gz).
+        Вместо имени файла можно передать открытый текстовый поток (например, sys.stdout) и формат fmt .csv или .txt.
+    '''
+
+    # Поток строк (например, из iter_table) записывается по мере чтения
+    if _is_stream(data):
+        # Проверка наличия данных
+        header = next(data, None)
+        if header is None:
+            raise ValueError("Нет данных для сохранения")
     # Проверка наличия данных
-    if not data:
+    elif not data:
         raise ValueError("Нет данных для сохранения")
 
+    # Запись в открытый текстовый поток по мере чтения строк
+    if _is_text_file(filename):
+        # Проверка формата и параметров, применимых только к файлам
+        if fmt not in ('.csv', '.txt'):
+            raise ValueError("В текстовый поток записываются только форматы .csv и .txt (укажите fmt)")
+        if max_rows is not None or append or compression is not None:
+            raise ValueError("Параметры max_rows, append и compression применимы только к файлам")
+        rows = itertools.chain([header], data) if _is_stream(data) else data
+        _write_text(filename, fmt, rows, _delimiter_dialect(delimiter) if delimiter is not None else None)
+        return
+
     # Проверка указания файла для сохранения
     if not filename or not filename.strip():
         raise ValueError("Не указан файл для сохранения")
 
+    # Сжатие: по параметру compression или по составному расширению имени файла
+    filename, compression = _compressed_filename(filename, compression)
+
     # Проверка формата, если не задан
     if fmt is None:
-        _, ext = os.path.splitext(filename)
-        if ext.lower() in ('.csv', '.pkl', '.txt'):
+        _, ext = os.path.splitext(_split_compression(filename)[0])
+        if ext.lower() in _FORMATS:
             fmt = ext.lower()
         else:
-            raise ValueError("Неизвестный формат файла. Используйте расширения .csv, .pkl или .txt")
+            raise ValueError("Неизвестный формат файла. Используйте расширения .csv, .pkl, .txt или .tbl")
 
     # Проверка корректности ввода максимального количества строк в одном файле, если оно задано
     if max_rows is not None and max_rows <= 0:
         raise ValueError(f"Параметр max_rows = {max_rows} может быть только положительным")
 
+    # Проверка корректности количества потоков записи, если оно задано
+    if workers is not None and workers <= 0:
+        raise ValueError(f"Параметр workers = {workers} может быть только положительным")
+
+    # Проверка разделителя .csv (по умолчанию ';', тот же диалект определяется при чтении)
+    dialect = _delimiter_dialect(delimiter) if delimiter is not None else None
+
+    # Проверка возможности сжатия
+    if compression is not None and fmt == '.tbl':
+        raise ValueError("Файлы .tbl читаются через mmap и не могут быть сжаты")
+
+    # Дозапись строк в конец существующего файла
+    if append:
+        if max_rows is not None:
+            raise ValueError("Параметры append и max_rows нельзя использовать вместе")
+        if compression is not None:
+            raise ValueError("Дозапись в сжатый файл не поддерживается")
+        if _is_stream(data):
+            _append_file(filename, fmt, header, data, delimiter)
+        else:
+            _append_file(filename, fmt, data[0], itertools.islice(data, 1, None), delimiter)
+        return
+
+    # Запись потока строк в один файл
+    if _is_stream(data):
+        if max_rows is None:
+            counter = [0]
+            _write_file(filename, fmt, itertools.chain([header], _counted(data, counter)), dialect, compression)
+            _count_written(counter[0], filename)
+            return
     # Запись данных в один файл
-    if max_rows is None or max_rows >= len(data):
-        if fmt == '.csv':
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f,
-                                    delimiter=';')  # Если в Excel таблице строка слепляется в одну ячейку, поменять значение delimiter на ','
-                writer.writerows(data)
-        elif fmt == '.pkl':
-            with open(filename, 'wb') as f:
-                pickle.dump(data, f)
-        elif fmt == '.txt':
-            with open(filename, 'w', encoding='utf-8') as f:
-                for line in data:
-                    f.write('\t'.join(str(el) for el in line) + '\n')
+    elif max_rows is None or max_rows >= len(data):
+        _write_file(filename, fmt, data, dialect, compression)
+        _count_written(len(data) - 1, filename)
         return
+    else:
+        header = data[0]  # Заголовоки файлов (подразумевается, что заголовок будет в каждом файле)
+        data = itertools.islice(data, 1, None)  # Строки без заголовка, без копирования срезов
 
     # Запись данных в несколько файлов
-    base, ext = os.path.splitext(filename)  # Базовое имя файла и его расширение
-    header = data[0]  # Заголовоки файлов (подразумевается, что заголовок будет в каждом файле)
-    total_rows = (
-                len(data) - 1)  # Количество строк без учета заголовка (подразумевается, что в каждом файле количество строк будет = заголовочная строка + max_rows)
-    file_count = (total_rows // max_rows) + (1 if total_rows % max_rows else 0)  # Количество файлов на фаходе
-
-    start = 1
-    for i in range(1, file_count + 1):
-        end = min(start + max_rows, total_rows)
-        splited_data = [header]
-        if start != end:
-            splited_data.extend(data[start:end])
-        else:
-            splited_data.append(data[start])
-        # Создание имени для каждого файла с помощью добавления индекса к названию
-        splited_data_filename = f"{base}_{i}{ext}"
+    _write_shards(data, header, filename, fmt, max_rows, workers, use_processes, dialect, compression)
 
-        if fmt == '.csv':
-            with open(splited_data_filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f, delimiter=';')
-                writer.writerows(splited_data)
-        elif fmt == '.pkl':
-            with open(splited_data_filename, 'wb') as f:
-                pickle.dump(splited_data, f)
-        elif fmt == '.txt':
-            with open(splited_data_filename, 'w', encoding='utf-8') as f:
-                for line in splited_data:
-                    f.write('\t'.join(str(el) for el in line) + '\n')
 
-        start = end
+def _count_written(rows, *filenames):
+    # Счётчики инструментирования для записанных файлов
+    if _instrumentation is not None:
+        _count(rows=rows, bytes=sum(os.path.getsize(filename) for filename in filenames))
 
 
-def get_rows_by_number(filename, start, stop=None, copy_table=False):
-    # Импорт данных из файла
-    data = load_table(filename)
+def _compressed_filename(filename, compression):
+    # Имя файла с расширением сжатия и вид сжатия
+    _, detected = _split_compression(filename)
+    if compression is None:
+        return filename, detected
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
+    # Проверка вида сжатия
+    suffixes = {name: suffix for suffix, name in _COMPRESSIONS.items()}
+    if compression not in suffixes:
+        raise ValueError(f"Неизвестное сжатие '{compression}'. Используйте {', '.join(suffixes)}")
+    if detected is None:
+        return filename + suffixes[compression], compression
+    if detected != compression:
+        raise ValueError(f"Расширение файла {filename} не соответствует сжатию '{compression}'")
+    return filename, compression
 
-    header = data[0]  # Заголовок
-    new_data = [header]  # Добавление заголовка, он не считается строкой данных
-    # Проверка корректности "начального" индекса
-    if start > len(data) - 1:  # Выситание заголовка
-        raise IndexError("Номер 'начальной' сохраняемой строки превышает количество строк в файле")
-    if start <= 0:
-        raise IndexError("Номер 'начальной' сохраняемой строки может быть только положительным")
 
-    # Проверка корректности "конечного" индекса
-    if stop is None or start == stop:
-        new_data.append(data[start])
-    elif stop > len(data) - 1:  # Выситание заголовка
-        raise IndexError("Номер 'последней' сохраняемой строки превышает количество строк в файле")
-    elif stop <= 0:
-        raise IndexError("Номер 'последней' сохраняемой строки может быть только положительным")
-    elif stop < start:
-        raise IndexError("Номер 'последней' сохраняемой строки не может превышать номер 'начальной' сохраняемой строки")
-    else:
-        new_data.extend(data[start:(stop + 1)])
+def _append_file(filename, fmt, header, rows, delimiter=None):
+    '''
+        Дозапись строк в конец файла .csv или .txt без перезаписи файла.
+        Заголовок добавляемых строк должен совпадать с заголовком файла; если файла нет, он создаётся.
+    '''
 
-    # Если не нужно создавать новый файл
-    if not copy_table:
-        save_table(new_data, filename)
+    # Проверка формата
+    if fmt not in ('.csv', '.txt'):
+        raise ValueError("Дозапись поддерживается только для файлов .csv и .txt")
+
+    # Новый файл записывается целиком, вместе с заголовком
+    if not os.path.isfile(filename) or os.path.getsize(filename) == 0:
+        dialect = _delimiter_dialect(delimiter) if delimiter is not None else None
+        _write_file(filename, fmt, itertools.chain([header], rows), dialect)
         return
-    # Если нужно создать новый файл с копией данных
-    else:
-        base, ext = os.path.splitext(filename)
-        copied_filename = f"{base}_copied{ext}"
-        save_table(new_data, copied_filename)
+
+    # Проверка совпадения заголовков
+    file_header = next(_iter_file_rows(filename, fmt, delimiter=delimiter), None)
+    if file_header != [str(el) for el in header]:
+        raise ValueError(f"Заголовок добавляемых строк не совпадает с заголовком файла {filename}")
+
+    _cache_invalidate(filename)
+    dialect = _csv_dialect(filename, delimiter) if fmt == '.csv' else None
+
+    # Если последняя строка файла не закончена переводом строки, он добавляется
+    with open(filename, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        needs_newline = f.read(1) != b'\n'
+
+    with open(filename, 'a', newline='' if fmt == '.csv' else None, encoding='utf-8') as f:
+        if needs_newline:
+            f.write('\n')
+        rows = _checked_width(rows, len(header), filename)
+        if fmt == '.csv':
+            csv.writer(f, **dialect).writerows(rows)
+        else:
+            for line in rows:
+                f.write('\t'.join(str(el) for el in line) + '\n')
+
+
+def _checked_width(rows, width, filename):
+    # Проверка количества столбцов добавляемых строк
+    for line in rows:
+        if len(line) != width:
+            raise ValueError(f"Некорректная структура столбцов в строках, добавляемых в файл {filename}")
+        yield line
+
+
+def _write_shards(rows, header, filename, fmt, max_rows, workers=None, use_processes=False, dialect=None,
+                  compression=None):
+    '''
+        Запись строк в файлы по max_rows строк: base_1.ext, base_2.ext, ...
+        Файлы переключаются по мере чтения строк. При workers > 1 файлы записываются параллельно
+        в потоках (или процессах, если use_processes=True), одновременно в памяти не больше 2 * workers частей.
+        После записи создаётся манифест base_manifest.json (имя, диапазон строк, размер и контрольная сумма каждого файла),
+        по которому load_table загружает весь набор файлов.
+    '''
+
+    base, ext = _split_name(filename)  # Базовое имя файла и его расширение (вместе с расширением сжатия)
+    shards = []  # Описание записанных файлов для манифеста
+    first_row = 1  # Номер первой строки текущего файла (без учёта заголовка)
+
+    pool = None
+    pending = collections.deque()
+    if workers is not None and workers > 1:
+        pool = (ProcessPoolExecutor if use_processes else ThreadPoolExecutor)(max_workers=workers)
+
+    try:
+        for i in itertools.count(1):
+            shard_rows = itertools.islice(rows, max_rows)
+            first_line = next(shard_rows, None)
+            if first_line is None:
+                break
+            # Создание имени для каждого файла с помощью добавления индекса к названию
+            shard_filename = f"{base}_{i}{ext}"
+            _cache_invalidate(shard_filename)
+
+            if pool is None:
+                counter = [1]
+                size, checksum = _write_shard(shard_filename, fmt,
+                                              itertools.chain([header, first_line], _counted(shard_rows, counter)),
+                                              dialect, compression)
+                row_count = counter[0]
+                shards.append(_shard_info(shard_filename, first_row, row_count, size, checksum))
+            else:
+                # Для параллельной записи строки части собираются в список (копируются только ссылки на строки)
+                shard = [header, first_line]
+                shard.extend(shard_rows)
+                row_count = len(shard) - 1
+                pending.append((shard_filename, first_row, row_count,
+                                pool.submit(_write_shard, shard_filename, fmt, shard, dialect, compression)))
+                # Ограничение количества частей, ожидающих записи
+                while len(pending) >= 2 * workers:
+                    shard_filename, shard_first_row, shard_rows_count, future = pending.popleft()
+                    shards.append(_shard_info(shard_filename, shard_first_row, shard_rows_count, *future.result()))
+
+            first_row += row_count
+
+        while pending:
+            shard_filename, shard_first_row, shard_rows_count, future = pending.popleft()
+            shards.append(_shard_info(shard_filename, shard_first_row, shard_rows_count, *future.result()))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    _count(rows=first_row - 1, bytes=sum(shard['bytes'] for shard in shards))
+
+    manifest = {
+        'format': fmt,
+        'compression': compression,
+        'header': list(header),
+        'rows': first_row - 1,
+        'shards': shards,
+    }
+    with _atomic_write(f"{base}{_MANIFEST_SUFFIX}") as temp_filename:
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def _counted(rows, counter):
+    # Подсчёт строк, проходящих через итератор
+    for line in rows:
+        counter[0] += 1
+        yield line
+
+
+def _write_shard(filename, fmt, rows, dialect=None, compression=None):
+    # Запись одной части (выполняется в потоке или процессе пула).
+    # Контрольная сумма считается по байтам, уходящим в файл, без повторного чтения записанного файла
+    checksum = hashlib.sha256()
+    size = _write_file(filename, fmt, rows, dialect, compression, checksum)
+    return size, checksum.hexdigest()
+
+
+class _HashingWriter(io.RawIOBase):
+    # Запись в файл с подсчётом записанных байтов и обновлением контрольной суммы
+
+    def __init__(self, f, checksum):
+        super().__init__()
+        self._file = f
+        self._checksum = checksum
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        written = self._file.write(data)
+        self._checksum.update(memoryview(data)[:written])
+        self.size += written
+        return written
+
+    def tell(self):
+        return self.size
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def _shard_info(filename, first_row, row_count, size, checksum):
+    return {
+        'file': os.path.basename(filename),
+        'first_row': first_row,
+        'last_row': first_row + row_count - 1,
+        'rows': row_count,
+        'bytes': size,
+        'sha256': checksum,
+    }
+
+
+def _expand_manifests(filenames):
+    # Замена файлов манифестов (base_manifest.json) на список записанных по ним файлов
+    expanded = []
+    for filename in filenames:
+        if _is_text_file(filename) or not filename.lower().endswith('.json'):
+            expanded.append(filename)
+            continue
+
+        with open(filename, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        directory = os.path.dirname(filename)
+        for shard in manifest['shards']:
+            shard_filename = os.path.join(directory, shard['file'])
+            # Проверка, что файл не изменился после записи (размер проверяется без чтения файла)
+            if os.path.isfile(shard_filename) and os.path.getsize(shard_filename) != shard['bytes']:
+                raise ValueError(f"Файл {shard_filename} не совпадает с манифестом {filename}")
+            expanded.append(shard_filename)
+    return expanded
+
+
+_WRITE_BUFFER_BYTES = 1024 * 1024  # Размер буфера записи файла
+_WRITE_BATCH_ROWS = 10_000  # Количество строк .txt, объединяемых в одну запись
+_COMPRESSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}  # Расширение сжатого файла -> сжатие
+
+
+def _write_file(filename, fmt, rows, dialect=None, compression=None, checksum=None):
+    '''
+        Запись строк (списка или итератора) в один файл.
+        Строки записываются во временный файл рядом с целевым, который после fsync атомарно заменяет целевой:
+        при сбое во время записи прежний файл остаётся целым.
+        Если передан checksum (объект hashlib), байты файла добавляются в него по мере записи,
+        а функция возвращает размер записанного файла.
+    '''
+
+    _cache_invalidate(filename)
+    with _atomic_write(filename) as temp_filename, contextlib.ExitStack() as stack:
+        target = temp_filename
+        if checksum is not None:
+            # Сжатие и текстовая кодировка пишут в буфер поверх подсчёта контрольной суммы
+            hashing = stack.enter_context(_HashingWriter(open(temp_filename, 'wb', buffering=0), checksum))
+            target = stack.enter_context(io.BufferedWriter(hashing, _WRITE_BUFFER_BYTES))
+
+        if fmt == '.csv' or fmt == '.txt':
+            with _open_file(target, 'w', compression, newline='' if fmt == '.csv' else None,
+                            encoding='utf-8') as f:
+                _write_text(f, fmt, rows, dialect)
+        elif fmt == '.pkl':
+            with _open_file(target, 'wb', compression) as f:
+                _write_pkl(f, rows)
+        elif fmt == '.tbl':
+            _write_tbl(target, rows if isinstance(rows, Table) else Table.from_rows(rows))
+
+        if checksum is not None:
+            stack.close()
+            return hashing.size
+
+
+def _write_text(f, fmt, rows, dialect=None):
+    # Запись строк в текстовый файл (или любой текстовый поток) формата .csv или .txt
+    if fmt == '.csv':
+        # Если в Excel таблице строка слепляется в одну ячейку, передать delimiter=',' в save_table
+        writer = csv.writer(f, **(dialect or {'delimiter': _CSV_DELIMITER}))
+        writer.writerows(rows)
+    else:
+        f.writelines(_txt_chunks(rows))
+
+
+def _txt_chunks(rows):
+    # Строки .txt, объединённые в куски по _WRITE_BATCH_ROWS строк (одна запись в файл на кусок)
+    rows = iter(rows)
+    while True:
+        batch = ['\t'.join([str(el) for el in line]) + '\n' for line in itertools.islice(rows, _WRITE_BATCH_ROWS)]
+        if not batch:
+            return
+        yield ''.join(batch)
+
+
+_temp_counter = itertools.count()  # Номера временных файлов процесса
+
+
+@contextlib.contextmanager
+def _atomic_write(filename):
+    # Временный файл для записи, который при успешном завершении заменяет filename (os.replace)
+    directory, name = os.path.split(os.path.abspath(filename))
+    temp_filename = os.path.join(directory, f".{name}.{os.getpid()}-{next(_temp_counter)}.tmp")
+    try:
+        yield temp_filename
+        # Сброс данных на диск до переименования, права доступа берутся у заменяемого файла
+        fd = os.open(temp_filename, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if os.path.exists(filename):
+            os.chmod(temp_filename, os.stat(filename).st_mode & 0o7777)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_filename)
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory):
+    # Сохранение на диск записи каталога о переименовании (на системах, где каталог можно открыть)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _open_file(filename, mode, compression=None, **kwargs):
+    # Открытие файла с буферизацией или потоковым сжатием (gzip, bz2, xz, zstd).
+    # Вместо имени можно передать открытый двоичный файл (потоки сжатия его не закрывают, это делает вызывающий код)
+    if compression is None:
+        if not isinstance(filename, (str, bytes, os.PathLike)):
+            return filename if 'b' in mode else io.TextIOWrapper(filename, **kwargs)
+        return open(filename, mode, buffering=_WRITE_BUFFER_BYTES if 'w' in mode else -1, **kwargs)
+    if 'b' not in mode:
+        mode += 't'
+    if compression == 'gzip':
+        return gzip.open(filename, mode, **kwargs)
+    if compression == 'bz2':
+        return bz2.open(filename, mode, **kwargs)
+    if compression == 'xz':
+        return lzma.open(filename, mode, **kwargs)
+    return _zstd_module().open(filename, mode, **kwargs)
+
+
+def _zstd_module():
+    # Модуль zstd: стандартный (Python 3.14+) или пакет zstandard
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Для сжатия zstd установите пакет zstandard: pip install zstandard")
+    return zstandard
+
+
+def _split_compression(filename):
+    # Имя файла без расширения сжатия и вид сжатия: data.csv.gz -> ('data.csv', 'gzip')
+    for suffix, compression in _COMPRESSIONS.items():
+        if filename.lower().endswith(suffix):
+            return filename[:-len(suffix)], compression
+    return filename, None
+
+
+def _split_name(filename):
+    # Базовое имя и расширение вместе с расширением сжатия: data.csv.gz -> ('data', '.csv.gz')
+    name, compression = _split_compression(filename)
+    base, ext = os.path.splitext(name)
+    return base, ext + filename[len(name):]
+
+
+def _is_stream(data):
+    # Итератор строк (генератор, iter_table) отличается от таблицы-списка наличием __next__
+    return hasattr(data, '__next__')
+
+
+# Асинхронная загрузка и сохранение
+# asyncio импортируется внутри функций: они вызываются из цикла событий, когда модуль уже загружен,
+# а программам без asyncio (например, lab4) его загрузка не нужна
+
+_ASYNC_CONCURRENCY = 8  # Количество файлов, одновременно читаемых или записываемых асинхронными функциями
+_ASYNC_BATCH_ROWS = 10_000  # Количество строк, передаваемых между потоком чтения (записи) и циклом событий за раз
+_ASYNC_QUEUE_BATCHES = 4  # Количество пачек строк, ожидающих записи; дальше чтение источника приостанавливается
+_async_semaphores = weakref.WeakKeyDictionary()  # Ограничители одновременных операций: цикл событий -> семафор
+
+
+def _async_slot():
+    # Семафор текущего цикла событий (семафор asyncio нельзя использовать в другом цикле)
+    import asyncio
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _async_semaphores[loop] = asyncio.Semaphore(_ASYNC_CONCURRENCY)
+    return semaphore
+
+
+async def aload_table(*filenames, fmt=None, detect_types=False, type_sample=None, workers=None, columns=None,
+                      where=None, delimiter=None, since_offset=None):
+    '''
+        Асинхронная загрузка таблицы: чтение и разбор файлов выполняются в потоках, не блокируя цикл событий.
+        Параметры, результат и ошибки - как у load_table.
+        Несколько файлов .csv или .txt читаются одновременно (во всех асинхронных вызовах не больше
+        _ASYNC_CONCURRENCY файлов), строки объединяются в порядке файлов.
+    '''
+
+    import asyncio
+
+    load = functools.partial(load_table, fmt=fmt, detect_types=detect_types, type_sample=type_sample, workers=workers,
+                             columns=columns, where=where, delimiter=delimiter, since_offset=since_offset)
+    # Один файл, дозагрузка и разбор в процессах выполняются одним вызовом load_table
+    if workers is not None or since_offset is not None:
+        async with _async_slot():
+            return await asyncio.to_thread(load, *filenames)
+
+    filenames, fmt = await asyncio.to_thread(_check_files, filenames, fmt)
+    # Файлы .tbl открываются через mmap без разбора, а .pkl разбирается целиком под GIL: их чтение не перекрывается
+    if fmt not in ('.csv', '.txt') or len(filenames) < 2:
+        async with _async_slot():
+            return await asyncio.to_thread(load, *filenames)
+
+    # Заголовок первого файла, с которым сравниваются заголовки остальных
+    header = await asyncio.to_thread(_file_header, filenames[0], fmt, delimiter)
+
+    async def load_file(filename):
+        async with _async_slot():
+            return await asyncio.to_thread(_load_file_rows, filename, fmt, header, columns, where, delimiter)
+
+    # Ошибки выбрасываются в порядке файлов, как при последовательной загрузке
+    results = await asyncio.gather(*(load_file(filename) for filename in filenames), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    all_data = results[0]
+    for rows in results[1:]:
+        all_data.extend(itertools.islice(rows, 1, None))
+
+    # Определение типа столбцов по надобности
+    if detect_types:
+        return all_data, await asyncio.to_thread(detect_column_types, all_data, type_sample)
+    return all_data
+
+
+def _file_header(filename, fmt, delimiter=None):
+    # Заголовок файла без чтения остальных строк
+    header = next(_iter_file_rows(filename, fmt, delimiter=delimiter), None)
+    if header is None:
+        raise ValueError(f"Файл {filename} пустой")
+    return header
+
+
+def _load_file_rows(filename, fmt, header, columns=None, where=None, delimiter=None):
+    # Строки одного файла из набора с теми же проверками, что при чтении набора через iter_table
+    if _file_header(filename, fmt, delimiter) != header:
+        raise ValueError(f"Заголовок в файле {filename} не совпадает с заголовками предыдущих файлов")
+    return list(_iter_rows([filename], fmt, columns, where, delimiter))
+
+
+async def aiter_table(*filenames, fmt=None, columns=None, where=None, delimiter=None):
+    '''
+        Асинхронный поток строк таблицы (async for): первым выдаётся заголовок, затем строки всех файлов.
+        Параметры и ошибки - как у iter_table. Файлы читаются в потоке пачками по _ASYNC_BATCH_ROWS строк:
+        следующая пачка читается, пока обрабатывается текущая, и чтение не опережает обработку больше чем на пачку.
+    '''
+
+    import asyncio
+
+    rows = await asyncio.to_thread(iter_table, *filenames, fmt=fmt, columns=columns, where=where, delimiter=delimiter)
+    pending = asyncio.ensure_future(asyncio.to_thread(_next_batch, rows))
+    try:
+        while True:
+            batch = await pending
+            if not batch:
+                return
+            pending = asyncio.ensure_future(asyncio.to_thread(_next_batch, rows))
+            for line in batch:
+                yield line
+    finally:
+        pending.cancel()
+
+
+def _next_batch(rows):
+    return list(itertools.islice(rows, _ASYNC_BATCH_ROWS))
+
+
+async def asave_table(data, filename, fmt=None, max_rows=None, workers=None, use_processes=False, delimiter=None,
+                      append=False, compression=None):
+    '''
+        Асинхронное сохранение таблицы: запись выполняется в потоке, не блокируя цикл событий.
+        Параметры и ошибки - как у save_table; во всех асинхронных вызовах одновременно записывается
+        не больше _ASYNC_CONCURRENCY таблиц.
+        data может быть асинхронным потоком строк (например, из aiter_table): строки передаются записи пачками
+        через очередь из _ASYNC_QUEUE_BATCHES пачек, и при отставании записи чтение источника приостанавливается.
+    '''
+
+    import asyncio
+
+    save = functools.partial(save_table, filename=filename, fmt=fmt, max_rows=max_rows, workers=workers,
+                             use_processes=use_processes, delimiter=delimiter, append=append, compression=compression)
+    if not hasattr(data, '__aiter__'):
+        async with _async_slot():
+            return await asyncio.to_thread(save, data)
+
+    # Асинхронный источник не занимает место в ограничении: скорость его записи задаёт сам источник
+    batches = asyncio.Queue(_ASYNC_QUEUE_BATCHES)
+    producer = asyncio.ensure_future(_fill_batches(data, batches))
+    try:
+        await asyncio.to_thread(save, _queued_rows(batches, asyncio.get_running_loop()))
+    finally:
+        producer.cancel()
+        # Запись, ожидающая следующую пачку (например, при отмене вызова), прерывается без замены файла
+        while not batches.empty():
+            batches.get_nowait()
+        batches.put_nowait(RuntimeError("Асинхронная запись прервана"))
+
+
+async def _fill_batches(rows, batches):
+    # Перенос строк асинхронного источника в очередь пачками (put ждёт, пока запись освободит место в очереди)
+    try:
+        batch = []
+        async for line in rows:
+            batch.append(line)
+            if len(batch) == _ASYNC_BATCH_ROWS:
+                await batches.put(batch)
+                batch = []
+        if batch:
+            await batches.put(batch)
+        await batches.put(None)
+    except Exception as error:
+        # Ошибка источника выбрасывается в потоке записи
+        await batches.put(error)
+
+
+def _queued_rows(batches, loop):
+    # Поток строк для save_table в потоке записи: пачки забираются из очереди цикла событий
+    import asyncio
+    while True:
+        batch = asyncio.run_coroutine_threadsafe(batches.get(), loop).result()
+        if batch is None:
+            return
+        if isinstance(batch, BaseException):
+            raise batch
+        yield from batch
+
+
+@_instrumented
+def get_rows_by_number(filename, start, stop=None, copy_table=False):
+    # Если передан поток строк (например, из iter_table), то выбранные строки возвращаются потоком
+    if _is_stream(filename):
+        # Проверка корректности индексов, которую можно выполнить без чтения потока
+        if start <= 0:
+            raise IndexError("Номер 'начальной' сохраняемой строки может быть только положительным")
+        if stop is not None and stop <= 0:
+            raise IndexError("Номер 'последней' сохраняемой строки может быть только положительным")
+        if stop is not None and stop < start:
+            raise IndexError("Номер 'последней' сохраняемой строки не может превышать номер 'начальной' сохраняемой строки")
+        return _iter_rows_by_number(filename, start, start if stop is None else stop)
+
+    # Импорт данных из файла (для .csv и .txt читаются только нужные строки по индексу смещений)
+    data = _load_rows(filename)
+
+    # Проверка данных
+    if len(data) == 1:
+        raise ValueError("Таблица содержит только заголовок")
+
+    header = data[0]  # Заголовок
+    new_data = [header]  # Добавление заголовка, он не считается строкой данных
+    # Проверка корректности "начального" индекса
+    if start > len(data) - 1:  # Выситание заголовка
+        raise IndexError("Номер 'начальной' сохраняемой строки превышает количество строк в файле")
+    if start <= 0:
+        raise IndexError("Номер 'начальной' сохраняемой строки может быть только положительным")
+
+    # Проверка корректности "конечного" индекса
+    if stop is None or start == stop:
+        new_data.append(data[start])
+    elif stop > len(data) - 1:  # Выситание заголовка
+        raise IndexError("Номер 'последней' сохраняемой строки превышает количество строк в файле")
+    elif stop <= 0:
+        raise IndexError("Номер 'последней' сохраняемой строки может быть только положительным")
+    elif stop < start:
+        raise IndexError("Номер 'последней' сохраняемой строки не может превышать номер 'начальной' сохраняемой строки")
+    else:
+        new_data.extend(data[start:(stop + 1)])
+
+    # Если не нужно создавать новый файл
+    if not copy_table:
+        save_table(new_data, filename, delimiter=_source_delimiter(filename))
+        return
+    # Если нужно создать новый файл с копией данных
+    else:
+        base, ext = _split_name(filename)
+        copied_filename = f"{base}_copied{ext}"
+        save_table(new_data, copied_filename, delimiter=_source_delimiter(filename))
         return
 
 
+def _iter_rows_by_number(rows, start, stop):
+    # Проверка наличия данных
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Нет данных")
+    yield header
+
+    # Чтение потока прекращается сразу после строки stop
+    count = 0
+    for count, line in enumerate(itertools.islice(rows, stop), 1):
+        if count >= start:
+            yield line
+
+    # Проверка данных и индексов, которые можно проверить только по количеству прочитанных строк
+    if count == 0:
+        raise ValueError("Таблица содержит только заголовок")
+    if count < start:
+        raise IndexError("Номер 'начальной' сохраняемой строки превышает количество строк в файле")
+    if count < stop:
+        raise IndexError("Номер 'последней' сохраняемой строки превышает количество строк в файле")
+
+
+@_instrumented
 def get_rows_by_index(filename, indices, copy_table=False):
     if indices == ():
         raise ValueError("Индексы не введены")
 
-    # Импорт данных из файла
-    data = load_table(filename)
+    # Импорт данных из файла (для .csv и .txt читаются только нужные строки по индексу смещений)
+    data = _load_rows(filename)
 
     # Проверка данных
     if len(data) == 1:
@@ -242,435 +1687,2641 @@ def get_rows_by_index(filename, indices, copy_table=False):
 
     # Если не нужно создавать новый файл
     if not copy_table:
-        save_table(new_data, filename)
+        save_table(new_data, filename, delimiter=_source_delimiter(filename))
         return
     # Если нужно создать новый файл с копией данных
     else:
-        base, ext = os.path.splitext(filename)
+        base, ext = _split_name(filename)
         copied_filename = f"{base}_copied{ext}"
-        save_table(new_data, copied_filename)
+        save_table(new_data, copied_filename, delimiter=_source_delimiter(filename))
+        return
+
+
+# Формат .pkl из групп строк
+#
+# Устройство файла: метка (8 байт), затем объекты pickle протокола 5 - заголовок и группы по _PKL_GROUP_ROWS строк.
+# Перед каждым объектом - размер pickle и количество внешних буферов (по 8 байт), затем размеры буферов;
+# после pickle идут сами буферы. pickle и буферы выровнены на 8 байт.
+# Группа строк - список строк; группа таблицы Table - (количество строк, столбцы Column), буферы столбцов
+# записываются вне pickle без копирования, а load_table загружает файл из таких групп таблицей Table.
+# Списки строк столбцами не хранятся: разбор строк на столбцы и обратная сборка строк при загрузке дольше,
+# чем pickle самих строк.
+# Файл без метки - прежний формат: один pickle со списком строк.
+
+_PKL_MAGIC = b'PKLROWS\x05'
+_PKL_FRAME = struct.Struct('<QQ')  # Размер pickle и количество внешних буферов объекта
+_PKL_SIZE = struct.Struct('<Q')  # Размер внешнего буфера
+_PKL_GROUP_ROWS = 65_536  # Количество строк в группе (кратно 8: битовая маска bool делится по границам байтов)
+
+
+def _write_pkl(f, rows):
+    '''
+        Запись строк (списка, потока или таблицы Table) в файл .pkl группами строк.
+        Строки собираются не больше чем по одной группе, столбцы Table передаются частями своих буферов без копирования.
+    '''
+
+    f.write(_PKL_MAGIC)
+    for obj in _pkl_objects(rows):
+        buffers = []
+        payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        f.write(_PKL_FRAME.pack(len(payload), len(raws)))
+        for raw in raws:
+            f.write(_PKL_SIZE.pack(raw.nbytes))
+        f.write(payload)
+        f.write(b'\x00' * (_aligned(len(payload)) - len(payload)))
+        for raw in raws:
+            f.write(raw)
+            f.write(b'\x00' * (_aligned(raw.nbytes) - raw.nbytes))
+
+
+def _pkl_objects(rows):
+    # Заголовок и группы строк для записи в .pkl
+    if isinstance(rows, Table):
+        yield rows.header
+        for start in range(0, rows.row_count, _PKL_GROUP_ROWS):
+            stop = min(start + _PKL_GROUP_ROWS, rows.row_count)
+            yield stop - start, [column._view(start, stop) for column in rows.columns]
+        return
+
+    rows = iter(rows)
+    yield next(rows)
+    while True:
+        group = list(itertools.islice(rows, _PKL_GROUP_ROWS))
+        if not group:
+            return
+        yield group
+
+
+def _read_pkl(filename):
+    # Построчное чтение файла .pkl: группы строк загружаются по одной
+    return _pkl_rows(_read_pkl_objects(filename))
+
+
+def _read_pkl_objects(filename):
+    '''
+        Заголовок и группы файла .pkl по одной.
+        Несжатый файл открывается через mmap, и буферы столбцов группы - представления частей файла без копирования.
+    '''
+
+    if _split_compression(filename)[1] is None:
+        with open(filename, 'rb') as f:
+            is_grouped = f.read(len(_PKL_MAGIC)) == _PKL_MAGIC
+            file_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if is_grouped else None
+        if file_map is not None:
+            view = memoryview(file_map)
+            position = len(_PKL_MAGIC)
+
+            def read(size):
+                nonlocal position
+                chunk = view[position:position + size]
+                position += size
+                return chunk
+
+            yield from _load_pkl_objects(read, filename)
+            return
+
+    with _open_input(filename, 'rb') as f:
+        magic = f.read(len(_PKL_MAGIC))
+        # Файл прежнего формата загружается целиком: заголовок и одна группа из остальных строк
+        if magic != _PKL_MAGIC:
+            rows = pickle.loads(magic + f.read())
+            if rows:
+                yield rows[0]
+                yield itertools.islice(rows, 1, None)
+            return
+        yield from _load_pkl_objects(f.read, filename)
+
+
+def _load_pkl_files(filenames, columns=None, where=None):
+    '''
+        Загрузка файлов .pkl, каждый объект файла загружается один раз.
+        Если все группы - столбцы таблицы Table, результат - таблица Table без сборки строк: столбцы группы - готовые
+        столбцы Column (у несжатого файла - части файла, открытого через mmap), столбцы нескольких групп
+        склеиваются Column.concat, как столбцы нескольких файлов .tbl.
+        Начиная с первой группы из списка строк (и для файла прежнего формата), результат - список строк:
+        уже загруженные столбцы собираются в строки, а не загружаются заново.
+    '''
+
+    header = None
+    selection = None  # Отбор столбцов и строк, если он задан
+    groups = []  # Столбцы групп, пока все группы - столбцы таблицы Table
+    rows = None  # Строки таблицы после первой группы из списка строк
+
+    def add_rows(lines, filename):
+        # Проверка и отбор строк группы
+        for line in lines:
+            if len(line) != len(header):
+                raise ValueError(f"Некорректная структура столбцов в файле {filename}")
+            if selection is None:
+                rows.append(line)
+            elif selection.matches(line):
+                rows.append(selection.project(line))
+
+    for filename in filenames:
+        objects = _read_pkl_objects(filename)
+
+        # Проверка наличия данных в файлах
+        current_header = next(objects, None)
+        if current_header is None:
+            raise ValueError(f"Файл {filename} пустой")
+
+        if header is None:
+            header = current_header
+            if columns is not None or where:
+                selection = _Selection(header, columns, where)
+        # Проверка на совпадение заголовков в оставшихся файлах
+        elif current_header != header:
+            raise ValueError(f"Заголовок в файле {filename} не совпадает с заголовками предыдущих файлов")
+
+        for group in objects:
+            if rows is None and isinstance(group, tuple):
+                _, group_columns = group
+                # Проверка структуры столбцов группы
+                if len(group_columns) != len(header) or groups and [column.type for column in group_columns] != \
+                        [column.type for column in groups[0]]:
+                    raise ValueError(f"Некорректная структура столбцов в файле {filename}")
+                groups.append(group_columns)
+                continue
+
+            if rows is None:
+                # Первая группа из списка строк: загруженные ранее столбцы собираются в строки
+                rows = []
+                for group_columns in groups:
+                    add_rows(map(list, zip(*group_columns)), filename)
+                groups = None
+            if isinstance(group, tuple):
+                if len(group[1]) != len(header):
+                    raise ValueError(f"Некорректная структура столбцов в файле {filename}")
+                group = map(list, zip(*group[1]))
+            add_rows(group, filename)
+
+    result_header = header if selection is None else selection.header
+    if rows is not None or not groups:
+        return [result_header] + (rows or [])
+
+    table = Table(header, groups[0] if len(groups) == 1 else
+                  [Column.concat(*group_columns) for group_columns in zip(*groups)])
+    if selection is not None:
+        table = _select_table(table, selection)
+    return table
+
+
+def _load_pkl_objects(read, filename):
+    # Объекты файла .pkl по одному; read(size) возвращает следующие size байт файла
+    def read_exactly(size):
+        chunk = read(size)
+        if len(chunk) != size:
+            raise ValueError(f"Файл {filename} повреждён: файл обрезан")
+        return chunk
+
+    while True:
+        frame = read(_PKL_FRAME.size)
+        if not len(frame):
+            return
+        if len(frame) != _PKL_FRAME.size:
+            raise ValueError(f"Файл {filename} повреждён: файл обрезан")
+        payload_size, buffer_count = _PKL_FRAME.unpack(frame)
+        sizes = [_PKL_SIZE.unpack(read_exactly(_PKL_SIZE.size))[0] for _ in range(buffer_count)]
+        payload = read_exactly(payload_size)
+        read_exactly(_aligned(payload_size) - payload_size)
+        buffers = []
+        for size in sizes:
+            buffers.append(read_exactly(size))
+            read_exactly(_aligned(size) - size)
+        yield pickle.loads(payload, buffers=buffers)
+
+
+def _pkl_rows(objects):
+    # Строки из заголовка и групп файла .pkl
+    header = next(objects, None)
+    if header is None:
         return
+    yield header
+    for group in objects:
+        if isinstance(group, tuple):
+            _, columns = group
+            yield from map(list, zip(*columns))
+        else:
+            yield from group
+
+
+# Бинарный колоночный формат .tbl
+#
+# Устройство файла: метка (8 байт), длина описания (8 байт), описание в JSON, затем блоки столбцов.
+# Каждый блок выровнен на 8 байт: значения int/datetime ('q'), float ('d'), битовая маска bool,
+# для str - смещения ('q') и байты UTF-8. Положение блоков указано в описании относительно начала данных.
+
+_TBL_MAGIC = b'TBL\x00\x00\x00\x00\x01'
+_TBL_PREFIX = struct.Struct('<8sQ')
+_TBL_ALIGN = 8
+
+
+def _aligned(size):
+    return (size + _TBL_ALIGN - 1) // _TBL_ALIGN * _TBL_ALIGN
+
+
+def _write_tbl(filename, table):
+    columns_meta = []
+    blocks = []
+    position = 0  # Смещение блока от начала данных
+
+    for name, column in zip(table.header, table.columns):
+        # Значения произвольных типов в бинарном виде не хранятся и записываются строками
+        if column.type == 'object':
+            column = Column('str', (str(value) for value in column))
+
+        column_meta = {'name': name, 'type': column.type, 'blocks': {}}
+        for block_name, buffer in column._buffers().items():
+            block = memoryview(buffer).cast('B')
+            column_meta['blocks'][block_name] = [position, block.nbytes]
+            blocks.append(block)
+            position += _aligned(block.nbytes)
+        columns_meta.append(column_meta)
+
+    description = json.dumps({
+        'rows': table.row_count,
+        'byteorder': sys.byteorder,
+        'columns': columns_meta,
+    }, ensure_ascii=False).encode('utf-8')
+
+    with _open_file(filename, 'wb') as f:
+        f.write(_TBL_PREFIX.pack(_TBL_MAGIC, len(description)))
+        f.write(description)
+        f.write(b'\x00' * (_aligned(f.tell()) - f.tell()))
+        for block in blocks:
+            f.write(block)
+            f.write(b'\x00' * (_aligned(block.nbytes) - block.nbytes))
+
+
+def _read_tbl(filename):
+    '''
+        Открытие файла .tbl через mmap. Столбцы возвращаемой таблицы - представления memoryview частей файла,
+        поэтому открытие не зависит от размера файла, а чтение столбца затрагивает только его страницы.
+    '''
+
+    with open(filename, 'rb') as f:
+        # Проверка формата файла
+        prefix = f.read(_TBL_PREFIX.size)
+        if len(prefix) < _TBL_PREFIX.size:
+            raise ValueError(f"Файл {filename} пустой")
+        magic, description_size = _TBL_PREFIX.unpack(prefix)
+        if magic != _TBL_MAGIC:
+            raise ValueError(f"Файл {filename} не является файлом формата .tbl")
+        description = json.loads(f.read(description_size).decode('utf-8'))
+        data_start = _aligned(_TBL_PREFIX.size + description_size)
+        # Файл отображается, если в нём есть хотя бы один блок данных (у таблицы без строк блок смещений
+        # столбца str тоже не пустой)
+        has_blocks = any(size for column_meta in description['columns'] for _, size in column_meta['blocks'].values())
+        file_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if has_blocks else None
+
+    row_count = description['rows']
+    swap_bytes = description['byteorder'] != sys.byteorder
+    header = []
+    columns = []
+    for column_meta in description['columns']:
+        buffers = {}
+        for block_name, (offset, size) in column_meta['blocks'].items():
+            start = data_start + offset
+            buffers[block_name] = memoryview(file_map)[start:start + size] if size else memoryview(b'')
+        header.append(column_meta['name'])
+        columns.append(Column._from_buffers(column_meta['type'], row_count, buffers, swap_bytes))
+
+    return Table(header, columns)
+
+
+def _load_tbl_files(filenames):
+    tables = [_read_tbl(filename) for filename in filenames]
+    header = tables[0].header
+
+    # Проверка на совпадение заголовков в оставшихся файлах
+    for filename, table in zip(filenames[1:], tables[1:]):
+        if table.header != header:
+            raise ValueError(f"Заголовок в файле {filename} не совпадает с заголовками предыдущих файлов")
+        if table.types != tables[0].types:
+            raise ValueError(f"Некорректная структура столбцов в файле {filename}")
+
+    if len(tables) == 1:
+        return tables[0]
+    return Table(header, [Column.concat(*columns) for columns in zip(*(table.columns for table in tables))])
+
+
+# Индекс смещений строк в файле
+
+_INDEX_SUFFIX = '.idx'  # Файл индекса хранится рядом с таблицей: data.csv -> data.csv.idx
+_INDEX_MAGIC = b'ROWIDX01'
+_INDEX_HEADER = struct.Struct('<8sqqq')  # Метка, mtime_ns и размер файла таблицы, количество смещений
+_ROW_OFFSETS_CACHE_SIZE = 8  # Количество индексов, запоминаемых в процессе
+_row_offsets_cache = collections.OrderedDict()  # Индексы, уже загруженные в этом процессе (давно не нужные вытесняются)
+
+
+def _load_rows(filename):
+    # Строки файла для выборки по номерам: уже загруженная таблица из кеша,
+    # индекс смещений для .csv и .txt, полная загрузка для остальных форматов
+    _, ext = os.path.splitext(filename)
+    if ext.lower() in ('.csv', '.txt') and os.path.isfile(filename):
+        cached = _cache_get(_cache_key(filename))
+        if cached is not None:
+            return cached
+        return _IndexedRows(filename, ext.lower())
+    return _cached_load(filename)
+
+
+_TABLE_CACHE_BYTES = 256 * 1024 * 1024  # Предельный размер кеша загруженных таблиц
+_table_cache = collections.OrderedDict()  # (путь, время изменения, размер, формат, типы) -> (таблица, размер)
+_table_cache_stats = {'hits': 0, 'misses': 0, 'bytes': 0, 'max_bytes': _TABLE_CACHE_BYTES}
+
+
+def table_cache_info():
+    '''
+        Статистика кеша загруженных таблиц: попадания, промахи, количество таблиц,
+        занятый и предельный размер в байтах (размер таблиц оценивается приблизительно).
+    '''
+
+    info = dict(_table_cache_stats)
+    info['entries'] = len(_table_cache)
+    return info
+
+
+def table_cache_clear(max_bytes=None):
+    # Очистка кеша таблиц (и запомненных индексов смещений строк) и статистики;
+    # max_bytes - новый предельный размер кеша (0 - кеш выключен)
+    if max_bytes is not None and max_bytes < 0:
+        raise ValueError(f"Параметр max_bytes = {max_bytes} не может быть отрицательным")
+    _table_cache.clear()
+    _row_offsets_cache.clear()
+    _table_cache_stats.update(hits=0, misses=0, bytes=0)
+    if max_bytes is not None:
+        _table_cache_stats['max_bytes'] = max_bytes
+
+
+def _cache_key(filename, fmt=None, types=None):
+    # Ключ кеша: таблица перечитывается, если у файла изменились время изменения или размер
+    stat = os.stat(filename)
+    if fmt is None:
+        fmt = os.path.splitext(filename)[1].lower()
+    return os.path.abspath(filename), stat.st_mtime_ns, stat.st_size, fmt, types
+
+
+def _cache_get(key):
+    cached = _table_cache.get(key)
+    if cached is None:
+        return None
+    _table_cache.move_to_end(key)
+    _table_cache_stats['hits'] += 1
+    return cached[0]
+
+
+def _cache_put(key, data):
+    # Возвращает True, если таблица сохранена в кеше
+    size = _table_nbytes(data)
+    # Таблица больше всего кеша (или при выключенном кеше) не сохраняется
+    if size > _table_cache_stats['max_bytes']:
+        return False
+    old = _table_cache.pop(key, None)
+    if old is not None:
+        _table_cache_stats['bytes'] -= old[1]
+    _table_cache[key] = (data, size)
+    _table_cache_stats['bytes'] += size
+    # Вытеснение давно не использованных таблиц
+    while _table_cache_stats['bytes'] > _table_cache_stats['max_bytes']:
+        _, (_, old_size) = _table_cache.popitem(last=False)
+        _table_cache_stats['bytes'] -= old_size
+    return True
+
+
+def _cached_result(key, data):
+    # Сохранение только что построенной таблицы в кеше: вызывающему отдаётся копия, только если таблица
+    # попала в кеш (таблица в кеше общая и не изменяется)
+    if _cache_put(key, data):
+        return _copy_table(data)
+    return data
+
+
+def _cache_invalidate(filename):
+    # Удаление из кеша всех таблиц файла (вызывается при записи файла)
+    path = os.path.abspath(filename)
+    for key in [key for key in _table_cache if key[0] == path]:
+        _table_cache_stats['bytes'] -= _table_cache.pop(key)[1]
+
+
+def _table_nbytes(data):
+    # Приблизительный размер таблицы в памяти (для списка строк - по первым строкам)
+    if isinstance(data, Table):
+        return data.nbytes
+    sample = data[:101]
+    sample_size = sum(sys.getsizeof(line) + sum(sys.getsizeof(value) for value in line) for line in sample)
+    return sample_size * len(data) // max(len(sample), 1)
+
+
+def _cached_load(filename):
+    # Загрузка таблицы через кеш; таблица из кеша общая, изменять её нельзя
+    if not isinstance(filename, str) or not os.path.isfile(filename):
+        return load_table(filename)  # Проверки и сообщения об ошибках load_table
+    key = _cache_key(filename)
+    data = _cache_get(key)
+    if data is None:
+        _table_cache_stats['misses'] += 1
+        data = load_table(filename)
+        _cache_put(key, data)
+    return data
+
+
+def _copy_table(data):
+    # Копия таблицы из кеша, которую можно изменять. Столбцы копии Table ссылаются на буферы исходных столбцов
+    # через memoryview и копируют их только при первом изменении (_make_writable), исходная таблица не меняется
+    if isinstance(data, Table):
+        return Table(data.header, [column._view(0, len(column)) for column in data.columns])
+    return [list(line) for line in data]
+
+
+def _row_offsets(filename, fmt):
+    '''
+        Смещения (в байтах) начала каждой записи файла, заголовок - запись 0.
+        Последний элемент - размер файла, поэтому запись i занимает байты offsets[i]:offsets[i + 1].
+        Индекс строится при первом обращении, сохраняется в файл рядом с таблицей
+        и перестраивается, если у таблицы изменились время изменения или размер.
+        Файл индекса открывается через mmap, поэтому смещения не занимают память процесса.
+    '''
+
+    stat = os.stat(filename)
+    key = os.path.abspath(filename)
+
+    cached = _row_offsets_cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        _row_offsets_cache.move_to_end(key)
+        return cached[2]
+
+    offsets = _read_index_file(filename + _INDEX_SUFFIX, stat)
+    if offsets is None:
+        offsets = _build_row_offsets(filename, fmt)
+        try:
+            _write_index_file(filename + _INDEX_SUFFIX, stat, offsets)
+            # Построенный индекс заменяется отображением записанного файла
+            offsets = _read_index_file(filename + _INDEX_SUFFIX, stat) or offsets
+        except OSError:
+            pass  # Индекс без файла рядом с таблицей (например, каталог только для чтения) остаётся в памяти
+
+    _row_offsets_cache[key] = (stat.st_mtime_ns, stat.st_size, offsets)
+    _row_offsets_cache.move_to_end(key)
+    while len(_row_offsets_cache) > _ROW_OFFSETS_CACHE_SIZE:
+        _row_offsets_cache.popitem(last=False)
+    return offsets
+
+
+def _build_row_offsets(filename, fmt):
+    offsets = array('q')
+    position = 0
+    in_quotes = False  # Для .csv: перевод строки внутри кавычек не начинает новую запись
+    quotechar = _csv_dialect(filename).get('quotechar', '"').encode() if fmt == '.csv' else None
+
+    with open(filename, 'rb') as f:
+        for line in f:
+            if not in_quotes and line.strip():
+                offsets.append(position)
+            if fmt == '.csv' and line.count(quotechar) % 2:
+                in_quotes = not in_quotes
+            position += len(line)
+
+    offsets.append(position)
+    return offsets
+
+
+def _read_index_file(index_filename, stat):
+    # Смещения из файла индекса - представление memoryview файла, открытого через mmap
+    try:
+        with open(index_filename, 'rb') as f:
+            magic, mtime_ns, size, count = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+            # Проверка актуальности индекса
+            if magic != _INDEX_MAGIC or mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+                return None
+            end = _INDEX_HEADER.size + count * 8
+            if os.fstat(f.fileno()).st_size < end:
+                return None
+            file_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, struct.error):
+        return None
+    return memoryview(file_map)[_INDEX_HEADER.size:end].cast('q')
+
+
+def _write_index_file(index_filename, stat, offsets):
+    # Файл индекса заменяется целиком: отображения прежнего файла в других местах остаются корректными
+    with _atomic_write(index_filename) as temp_filename:
+        with open(temp_filename, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, stat.st_mtime_ns, stat.st_size, len(offsets)))
+            offsets.tofile(f)
+
+
+class _IndexedRows:
+    '''
+        Строки файла .csv или .txt с доступом по номеру без разбора всего файла.
+        Ведёт себя как список строк с заголовком: len(), [i] и срезы [start:stop].
+    '''
+
+    def __init__(self, filename, fmt):
+        self.filename = filename
+        self.fmt = fmt
+        self.offsets = _row_offsets(filename, fmt)
+        self.dialect = _csv_dialect(filename) if fmt == '.csv' else None
+        self._rows = None  # Полностью загруженная таблица, если записи файла не соответствуют строкам
+
+        # Проверка наличия данных в файле
+        if len(self.offsets) == 1:
+            raise ValueError(f"Файл {filename} пустой")
+        self.header = self._read(0, 1)[0]
+
+    def _read(self, start, stop):
+        # Чтение записей start..stop-1 одним непрерывным куском файла
+        if self._rows is not None:
+            return self._rows[start:stop]
+
+        with open(self.filename, 'rb') as f:
+            f.seek(self.offsets[start])
+            chunk = f.read(self.offsets[stop] - self.offsets[start])
+        text = io.StringIO(chunk.decode('utf-8'), newline='' if self.fmt == '.csv' else None)
+        rows = list(_iter_text_rows(text, self.fmt, dialect=self.dialect))
+
+        # Если одна запись файла дала несколько строк таблицы, номера строк не совпадают с индексом
+        if len(rows) != stop - start:
+            self._rows = load_table(self.filename)
+            return self._rows[start:stop]
+
+        # Проверка строк
+        if start > 0:
+            for line in rows:
+                if len(line) != len(self.header):
+                    raise ValueError(f"Некорректная структура столбцов в файле {self.filename}")
+        return rows
+
+    def __len__(self):
+        if self._rows is not None:
+            return len(self._rows)
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if start >= stop:
+                return []
+            return self._read(start, stop)[::step]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("Номер строки вне диапазона")
+        return self._read(index, index + 1)[0]
+
+
+@_instrumented
+def get_column_types(filename, by_number=True, sample=None):
+    # Поток строк (например, из iter_table) проверяется по мере чтения, без загрузки таблицы в память
+    if _is_stream(filename):
+        header, data = _peek_rows(filename)
+    else:
+        # Импорт данных из файла (повторная загрузка того же файла берётся из кеша)
+        data = _cached_load(filename)
+
+        # Проверка данных
+        if len(data) == 1:
+            raise ValueError("Таблица содержит только заголовок")
+
+        header = data[0]  # Заголовок
+        _count(rows=len(data) - 1)
+
+    # Определение типа каждого столбца с проверкой всех строк на соответствие типу столбца
+    detected_types = infer_column_types(data, sample=sample, strict=True)
+
+    column_types = {}
+    if by_number:
+        for col_idx, col_type in enumerate(detected_types):
+            column_types[col_idx + 1] = col_type
+    else:
+        for col_idx, col_type in enumerate(detected_types):
+            column_types[header[col_idx]] = col_type
+
+    return column_types
+
+
+@_instrumented
+def set_column_types(filename, types_dict,
+                     by_number=True, as_table=False, backend='python'):  # Из задания е очень ясно, что должна делать эта функция, так что реализую её по смыслу программы
+
+    '''
+        Функция принимает файл и словарь с типами столбцов.
+        Функция возвращает данные из файла со значениями в столбцах, приведёнными к нужным типам из словаря types_dict.
+        Если в словаре types_dict не задан тип столбца, то функция оставляет тип столбца по умолчанию (str).
+        Параметр by_number даёт вункции понять, каким образом определены столбцы в словаре types_dict.
+        Если as_table=True, функция возвращает колоночную таблицу Table с типизированными столбцами.
+        backend='numpy' - столбцы приводятся к типам целиком средствами NumPy, результат - таблица Table.
+        Если вместо файла передан поток строк (например, из iter_table), строки приводятся к типам
+        по мере чтения и возвращаются потоком.
+    '''
+
+    # Проверка корректности способа приведения типов
+    if backend not in ('python', 'numpy'):
+        raise ValueError(f"Неизвестный способ приведения типов '{backend}'. Используйте 'python' или 'numpy'")
+
+    if _is_stream(filename):
+        # Поток приводится к типам построчно, колоночная таблица из него не собирается
+        if as_table or backend != 'python':
+            raise ValueError("Поток строк приводится к типам только построчно: as_table и backend='numpy' не поддерживаются")
+        header, data = _peek_rows(filename)
+    else:
+        # Импорт данных из файла (повторная загрузка того же файла берётся из кеша)
+        data = _cached_load(filename)
+
+        # Проверка данных
+        if len(data) == 1:
+            raise ValueError("Таблица содержит только заголовок")
+
+        header = data[0]  # заголовок
+
+    # Проверка наличия переданноый значений типов столбцов
+    if not types_dict:
+        raise ValueError("Значений типов столбцов не введены")
+
+    column_count = len(header)  # Количество столбцов в файле
+
+    # Сопоставдение каждого индекса столбца с целевым типом столбца
+    col_type_map = {}
+
+    if by_number:
+        for col_num, col_type in types_dict.items():
+            # Проверка введённого словаря на крректность
+            if not isinstance(col_num, int):
+                raise ValueError("Словарь введён некорректно")
+            real_index = col_num - 1
+            # Проверка индексов столбцов на корректность
+            if real_index < 0 or real_index >= column_count:
+                raise IndexError(f"Столбец с индексом {col_num} некорректен (всего столбцов: {column_count})")
+            col_type_map[real_index] = col_type
+    else:
+        for col_name, col_type in types_dict.items():
+            # Проверка введённого словаря на крректность
+            if isinstance(col_name, int):
+                raise ValueError("Словарь введён некорректно")
+            # Провека значений столбцов на корректность
+            if col_name not in header:
+                raise ValueError(f"В заголовке нет столбца с названием '{col_name}'")
+            real_index = header.index(col_name)
+            col_type_map[real_index] = col_type
+
+    cast_value = _cast_value  # Функция приведения значения к нужному типу
+
+    # Строки потока приводятся к типам по мере чтения
+    if _is_stream(data):
+        return _iter_cast_rows(data, header, col_type_map)
+
+    # Таблица, уже приведённая к тем же типам, берётся из кеша (возвращается копия, которую можно изменять)
+    typed_key = _cache_key(filename, types=(tuple(sorted(col_type_map.items())), as_table, backend))
+    typed_data = _cache_get(typed_key)
+    if typed_data is not None:
+        _count(rows=len(data) - 1, rows_copied=len(data) - 1)
+        return _copy_table(typed_data)
+
+    _count(rows=len(data) - 1, cells_cast=(len(data) - 1) * len(col_type_map))
+
+    # Приведение столбцов целиком средствами NumPy
+    if backend == 'numpy':
+        typed_data = _cast_columns_numpy(data, col_type_map, cast_value)
+        return _cached_result(typed_key, typed_data)
+
+    # Сборка типизированных столбцов без промежуточного списка строк
+    if as_table:
+        columns = []
+        for col_idx in range(column_count):
+            current_type = col_type_map.get(col_idx, 'str')
+            column = Column(current_type)
+            for line in itertools.islice(data, 1, None):
+                original_value = line[col_idx]
+                try:
+                    column.append(cast_value(original_value, current_type))
+                except ValueError:
+                    raise ValueError(
+                        f"Не удалось привести значение '{original_value}' в столбце '{header[col_idx]}' к типу {current_type}"
+                    )
+            columns.append(column)
+        typed_data = Table(header, columns)
+        return _cached_result(typed_key, typed_data)
+
+    # Строки из кеша не изменяются, типы присваиваются значениям копии (в том числе строк таблицы Table)
+    data = [list(line) for line in data]
+    _count(rows_copied=len(data) - 1)
+
+    # Присвоение типов значений столбцов
+    for line_idx in range(1, len(data)):
+        for col_idx in range(column_count):
+            # Присвоение нового типа значениям в столбцах
+            current_type = col_type_map.get(col_idx, 'str')
+            original_value = data[line_idx][col_idx]
+            try:
+                data[line_idx][col_idx] = cast_value(original_value, current_type)
+            except ValueError:
+                raise ValueError(
+                    f"Не удалось привести значение '{original_value}' в столбце '{header[col_idx]}' к типу {current_type}"
+                )
+
+    return _cached_result(typed_key, data)
+
+
+def _peek_rows(rows):
+    # Заголовок потока строк и тот же поток целиком; в потоке должна быть хотя бы одна строка данных
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Нет данных")
+    first = next(rows, None)
+    if first is None:
+        raise ValueError("Таблица содержит только заголовок")
+    return header, itertools.chain([header, first], rows)
+
+
+def _iter_cast_rows(rows, header, col_type_map):
+    # Построчное приведение типов потока (первым выдаётся заголовок, столбцы без типа остаются как есть)
+    yield next(rows)
+    for line in rows:
+        line = list(line)
+        for col_idx, current_type in col_type_map.items():
+            original_value = line[col_idx]
+            try:
+                line[col_idx] = _cast_value(original_value, current_type)
+            except ValueError:
+                raise ValueError(
+                    f"Не удалось привести значение '{original_value}' в столбце '{header[col_idx]}' к типу {current_type}"
+                )
+        yield line
+
+
+def _cast_value(value, to_type):
+    # Приведение значения к типу из словаря типов set_column_types
+    if to_type == 'int':
+        return int(value)
+    elif to_type == 'float':
+        return float(value)
+    elif to_type == 'bool':
+        return str(value).lower() in ('true', '1', 'yes', 'да')
+    elif to_type == 'datetime':
+        return _parse_datetime(value)
+    else:
+        return str(value)
+
+
+def _column_type_map(header, types):
+    # Словарь типов столбцов (номер с 1 или название -> тип) в виде индекс столбца с 0 -> тип
+    col_type_map = {}
+    for column, col_type in (types or {}).items():
+        # Проверка типа
+        if col_type not in ('int', 'float', 'bool', 'datetime', 'str'):
+            raise ValueError(f"Неизвестный тип столбца '{col_type}'")
+        col_type_map[_column_index(header, column)] = col_type
+    return col_type_map
+
+
+def _cast_columns_numpy(data, col_type_map, cast_value):
+    '''
+        Приведение типов целых столбцов средствами NumPy.
+        Столбцы int, float, bool и datetime хранятся в массивах NumPy, таблица Table ссылается на них без копирования.
+        Если столбец не удалось привести целиком, значения проверяются по одному, чтобы сообщить первое некорректное значение.
+    '''
+
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("Для backend='numpy' нужна библиотека numpy (pip install numpy)")
+
+    header = data[0]
+    row_count = len(data) - 1
+    true_values = frozenset(('true', '1', 'yes', 'да'))
+
+    columns = []
+    for col_idx in range(len(header)):
+        # Значения столбца собираются без обхода ячеек в цикле Python
+        values = list(map(operator.itemgetter(col_idx), itertools.islice(data, 1, None)))
+        current_type = col_type_map.get(col_idx, 'str')
+        if current_type not in ('int', 'float', 'bool', 'datetime'):
+            columns.append(Column('str', values))
+            continue
+
+        try:
+            if current_type == 'int':
+                typed = np.array(values, dtype=np.int64)
+            elif current_type == 'float':
+                typed = np.array(values, dtype=np.float64)
+            elif current_type == 'bool':
+                # Значения уже типизированной таблицы (например, .tbl) приводятся к строке, как в _cast_value
+                flags = np.fromiter((str(value).lower() in true_values for value in values), dtype=bool, count=row_count)
+                typed = np.packbits(flags, bitorder='little')
+            else:
+                # Значения datetime хранятся как количество микросекунд от 1970-01-01.
+                # Дату с часовым поясом NumPy переводит в UTC с предупреждением, такие столбцы приводятся по одному
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error')
+                    typed = np.array(values, dtype='datetime64[us]')
+                # NumPy молча превращает '' и 'NaT' в NaT, такие значения проверяются по одному
+                if np.isnat(typed).any():
+                    raise ValueError(f"Пустая дата в столбце '{header[col_idx]}'")
+                typed = typed.view(np.int64)
+        except (ValueError, TypeError, OverflowError, Warning):
+            # Поиск первого значения, которое не приводится к типу столбца
+            for original_value in values:
+                try:
+                    cast_value(original_value, current_type)
+                except ValueError:
+                    raise ValueError(
+                        f"Не удалось привести значение '{original_value}' в столбце '{header[col_idx]}' к типу {current_type}"
+                    )
+            # Все значения приводятся по одному (например, даты в формате ДД.ММ.ГГГГ, которые NumPy не разбирает)
+            columns.append(Column(current_type, (cast_value(value, current_type) for value in values)))
+            continue
+
+        columns.append(Column._from_buffers(current_type, row_count, {'data': memoryview(typed).cast('B')}))
+
+    return Table(header, columns)
+
+
+@_instrumented
+def get_values(data, column=1):
+    # Если передан поток строк, значения столбца возвращаются потоком
+    if _is_stream(data):
+        # Проверка наличия данных
+        header = next(data, None)
+        if header is None:
+            raise ValueError("Нет данных")
+        col_idx = _column_index(header, column)
+        return _iter_values(data, col_idx)
+
+    # Проверка наличия данных
+    if not data:
+        raise ValueError("Нет данных")
+
+    # Проверка данных
+    if len(data) == 1:
+        raise ValueError("Таблица содержит только заголовок")
+
+    header = data[0]  # Заголовок
+    column_count = len(header)  # Количество столбцов в файле
+
+    # Определение индекса столбца
+    if isinstance(column, int):
+        # Проверка корректности индекса введенного столбца
+        if column <= 0 or column > column_count:
+            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
+        col_idx = column - 1
+    else:
+        # Проверка корректности названия введенного столбца
+        if column not in header:
+            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
+        col_idx = header.index(column)
+
+    # Колоночная таблица отдаёт столбец целиком, без обхода строк
+    if isinstance(data, Table):
+        return data.columns[col_idx]
+
+    # Предполагается, что таблица уже типизирована (если вызывалась set_column_types),
+    values = [line[col_idx] for line in itertools.islice(data, 1, None)]
+
+    return values
+
+
+def _iter_values(rows, col_idx):
+    count = 0
+    for count, line in enumerate(rows, 1):
+        yield line[col_idx]
+
+    # Проверка данных
+    if count == 0:
+        raise ValueError("Таблица содержит только заголовок")
+
+
+def _column_index(header, column):
+    column_count = len(header)  # Количество столбцов в файле
+
+    # Определение индекса столбца
+    if isinstance(column, int):
+        # Проверка корректности индекса введенного столбца
+        if column <= 0 or column > column_count:
+            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
+        return column - 1
+
+    # Проверка корректности названия введенного столбца
+    if column not in header:
+        raise ValueError(f"В заголовке нет столбца с названием '{column}'")
+    return header.index(column)
+
+
+@_instrumented
+def get_value(data, column=1):
+    # Проверка наличия данных
+    if not data:
+        raise ValueError("Нет данных")
+
+    # Проверка данных
+    if len(data) == 1:
+        raise ValueError("Таблица содержит только заголовок")
+    if len(data) > 2:
+        raise ValueError("В таблице должна быть одна строка без учёта заголовка")
+
+    header = data[0]  # Заголовок
+    column_count = len(header)  # Количество столбцов в файле
+
+    # Определение индекса столбца
+    if isinstance(column, int):
+        # Проверка корректности индекса введенного столбца
+        if column <= 0 or column > column_count:
+            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
+        col_idx = column - 1
+    else:
+        # Проверка корректности названия введенного столбца
+        if column not in header:
+            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
+        col_idx = header.index(column)
+
+    # Колоночная таблица
+    if isinstance(data, Table):
+        return data.columns[col_idx][0]
+
+    # Предполагается, что таблица уже типизирована (если вызывалась set_column_types),
+    value = data[1][col_idx]
+
+    return value
+
+
+@_instrumented
+def set_values(data, values, column=1, inplace=False):
+    # Проверка наличия данных
+    if not data:
+        raise ValueError("Нет данных")
+    if not values:
+        raise ValueError(f"Нет данных о значениях столбца {column}")
+
+    # Проверка данных
+    if len(data) == 1:
+        raise ValueError("Таблица содержит только заголовок")
+
+    # Проверка корректрости переданных значений в столбце
+    if len(data) - 1 != len(values):
+        raise ValueError(
+            "Количество значений в переданном столбце не совпадает с количеством значений в столбце таблицы")
+
+    header = data[0]  # Заголовок
+    column_count = len(header)  # Количество столбцов в файле
+    new_data = [header]  # Новый список данных
+
+    # Определение индекса столбца
+    if isinstance(column, int):
+        # Проверка корректности индекса введенного столбца
+        if column <= 0 or column > column_count:
+            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
+
+        col_idx = column - 1
+    else:
+        # Проверка корректности названия введенного столбца
+        if column not in header:
+            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
+        col_idx = header.index(column)
+
+    # В колоночной таблице заменяется только один столбец, остальные столбцы не копируются
+    if isinstance(data, Table):
+        return _replace_column(data, col_idx, values, column, inplace)
+
+    # Проверка на совпадение типа значений с типом столбца (один раз на столбец)
+    _check_value_types(map(operator.itemgetter(col_idx), itertools.islice(data, 1, None)), values, column)
+
+    # Замена значений в строках самой таблицы
+    if inplace:
+        # Строки представления принадлежат исходным таблицам, поэтому перед изменением они копируются
+        if isinstance(data, TableView):
+            data.materialize()
+        _forget_indexes(data)
+        for line, value in zip(itertools.islice(data, 1, None), values):
+            line[col_idx] = value
+        return data
+
+    # Заполнение нового списка данных
+    for line, value in zip(itertools.islice(data, 1, None), values):
+        new_line = list(line)
+        new_line[col_idx] = value
+        new_data.append(new_line)
+    _count(rows=len(values), rows_copied=len(values))
+
+    return new_data
+
+
+@_instrumented
+def set_value(data, value, column=1, inplace=False):
+    # Проверка наличия данных
+    if not data:
+        raise ValueError("Нет данных")
+    if not value:
+        raise ValueError(f"Нет данный о значении столбца {column}")
+
+    # Проверка данных
+    if len(data) == 1:
+        raise ValueError("Таблица содержит только заголовок")
+    if len(data) > 2:
+        raise ValueError("В таблице должна быть одна строка без учёта заголовка")
+
+    header = data[0]  # Заголовок
+    column_count = len(header)  # Количество столбцов в файле
+    new_data = [header]  # Новый список данных
+
+    # Определение индекса столбца
+    if isinstance(column, int):
+        # Проверка корректности индекса введенного столбца
+        if column <= 0 or column > column_count:
+            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
+
+        col_idx = column - 1
+    else:
+        # Проверка корректности названия введенного столбца
+        if column not in header:
+            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
+        col_idx = header.index(column)
+
+    # Колоночная таблица
+    if isinstance(data, Table):
+        return _replace_column(data, col_idx, [value], column, inplace)
+
+    # Проверка на совпадение типа значения с типом столбца
+    if type(data[1][col_idx]) != type(value):
+        raise TypeError(f"Тип значения {value} не совпадает с типом столбца {column}")
+
+    # Замена значения в строке самой таблицы
+    if inplace:
+        if isinstance(data, TableView):
+            data.materialize()
+        _forget_indexes(data)
+        data[1][col_idx] = value
+        return data
+
+    # Заполнение нового списка данных
+    new_line = list(data[1])
+    new_line[col_idx] = value
+    new_data.append(new_line)
+
+    return new_data
+
+
+def _check_value_types(old_values, values, column):
+    # Если в столбце и в новых значениях по одному и тому же типу, значения не сравниваются попарно
+    old_values = list(old_values)
+    old_types = set(map(type, old_values))
+    if len(old_types) == 1 and set(map(type, values)) == old_types:
+        return
+
+    # Поиск первого значения, тип которого не совпадает с типом значения в столбце
+    for el, value in zip(old_values, values):
+        if type(el) != type(value):
+            raise TypeError(f"Тип значения {value} не совпадает с типом столбца {column}")
+
+
+def _replace_column(table, col_idx, values, column, inplace=False):
+    old_column = table.columns[col_idx]
+    expected_type = _PYTHON_TYPES.get(old_column.type)
+
+    # Проверка на совпадение типа значений с типом столбца (тип столбца известен заранее)
+    if expected_type is not None:
+        if set(map(type, values)) != {expected_type}:
+            for value in values:
+                if type(value) is not expected_type:
+                    raise TypeError(f"Тип значения {value} не совпадает с типом столбца {column}")
+    else:
+        _check_value_types(old_column, values, column)
+
+    new_column = Column(old_column.type, values)
+    if inplace:
+        _forget_indexes(table)
+        table.columns[col_idx] = new_column
+        return table
+
+    columns = list(table.columns)
+    columns[col_idx] = new_column
+    return Table(table.header, columns)
+
+
+@_instrumented
+def print_table(data, max_rows=None, head=None, tail=None, sample=100, max_width=None, page_size=1000, file=None):
+    '''
+        Вывод таблицы в виде сетки (как tabulate с tablefmt="fancy_grid").
+        data - таблица (список строк, Table, TableView) или поток строк из iter_table.
+        Ширины столбцов вычисляются по заголовку и первым sample строкам, значения длиннее ширины
+        (или длиннее max_width символов) обрезаются с многоточием, строки выводятся страницами по page_size строк по мере чтения.
+        head / tail - количество выводимых первых / последних строк, пропущенные строки заменяются строкой "…";
+        max_rows - ограничение количества строк: при превышении выводятся первые и последние max_rows // 2 строк.
+        Небольшие таблицы, целиком попадающие в выборку, выводятся через tabulate как раньше.
+    '''
+
+    # Проверка наличия данных
+    if data is None or (not _is_stream(data) and not data):
+        raise ValueError("Нет данных")
+
+    # Проверка параметров
+    for name, value in (('max_rows', max_rows), ('head', head), ('tail', tail)):
+        if value is not None and (not isinstance(value, int) or value < 0):
+            raise ValueError(f"Параметр {name} должен быть неотрицательным целым числом")
+    for name, value in (('sample', sample), ('max_width', max_width), ('page_size', page_size)):
+        if value is not None and (not isinstance(value, int) or value < 1):
+            raise ValueError(f"Параметр {name} должен быть положительным целым числом")
+
+    if file is None:
+        file = sys.stdout
+
+    # Ограничение max_rows - первые и последние строки поровну
+    if max_rows is not None and head is None and tail is None:
+        head = max_rows - max_rows // 2
+        tail = max_rows // 2
+    elif head is not None and tail is None:
+        tail = 0
+    elif tail is not None and head is None:
+        head = 0
+
+    rows = iter(data)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Нет данных")
+
+    skipped = 0
+    if head is None:
+        # Строки, по которым вычисляются ширины столбцов; остальные выводятся по мере чтения
+        sampled = list(itertools.islice(rows, sample))
+
+        # Небольшая таблица без ограничений - прежний вывод через tabulate
+        if max_width is None:
+            extra = next(rows, None)
+            if extra is None:
+                # tabulate импортируется только здесь: загрузка модуля без вывода таблиц его не требует
+                from tabulate import tabulate
+                _count(rows=len(sampled))
+                print(tabulate(sampled, header, tablefmt="fancy_grid"), file=file)
+                return
+            rows = itertools.chain([extra], rows)
+    else:
+        # Выводятся только первые head и последние tail строк: последние хранятся в кольцевом буфере,
+        # остальные только подсчитываются, ширины вычисляются по всем выводимым строкам
+        if _is_stream(data):
+            sampled = list(itertools.islice(rows, head))
+            last = collections.deque(maxlen=tail)
+            for line in rows:
+                if len(last) == tail:
+                    skipped += 1
+                last.append(line)
+        else:
+            # Таблица с доступом по номеру строки - нужные строки берутся срезами без обхода
+            count = len(data) - 1
+            sampled = list(data[1:min(head, count) + 1])
+            skipped = max(count - head - tail, 0)
+            last = data[max(head, count - tail) + 1:] if count > head else []
+        rows = iter(())
+        if skipped:
+            sampled.append(None)
+        sampled.extend(last)
+
+    header_cells = [_cell_text(value) for value in header]
+    sampled_cells = [None if line is None else [_cell_text(value) for value in line] for line in sampled]
+    sampled = [line for line in sampled if line is not None]
+
+    widths = [len(cell) for cell in header_cells]
+    for cells in sampled_cells:
+        for i, cell in enumerate((cells or ())[:len(widths)]):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+    if max_width is not None:
+        widths = [min(width, max_width) for width in widths]
+
+    # Числовые столбцы выравниваются по правому краю
+    numeric = [bool(sampled) for _ in widths]
+    for line in sampled:
+        for i, value in enumerate(line[:len(widths)]):
+            if numeric[i] and not _is_number(value):
+                numeric[i] = False
+
+    def border(left, fill, middle, right):
+        return left + middle.join(fill * (width + 2) for width in widths) + right
+
+    def render(cells):
+        parts = []
+        for i, width in enumerate(widths):
+            cell = cells[i] if i < len(cells) else ''
+            if len(cell) > width:
+                cell = cell[:width - 1] + '…'
+            parts.append(cell.rjust(width) if numeric[i] else cell.ljust(width))
+        return '│ ' + ' │ '.join(parts) + ' │'
+
+    row_separator = border('├', '─', '┼', '┤')
+    page = [border('╒', '═', '╤', '╕'), render(header_cells)]
+    printed = 0
+
+    def emit(line):
+        nonlocal page, printed
+        page.append(border('╞', '═', '╪', '╡') if printed == 0 else row_separator)
+        page.append(line)
+        printed += 1
+        # Вывод очередной страницы из page_size строк таблицы (без учёта линий-разделителей)
+        if printed % page_size == 0:
+            print('\n'.join(page), file=file, flush=True)
+            page = []
+
+    for cells in sampled_cells:
+        # Пропущенные строки заменяются строкой многоточий
+        emit(render(['…'] * len(widths) if cells is None else cells))
+    for line in rows:
+        emit(render([_cell_text(value) for value in line]))
+
+    page.append(border('╘', '═', '╧', '╛'))
+    _count(rows=printed - (1 if skipped else 0))
+    # Итог, как у представления датафрейма
+    if skipped:
+        page.append(f"[{len(sampled) + skipped} строк x {len(widths)} столбцов]")
+    print('\n'.join(page), file=file, flush=True)
+
+
+def _cell_text(value):
+    # Текст ячейки для вывода в сетке
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return format(value, 'g')
+    return str(value).replace('\n', ' ')
+
+
+def _is_number(value):
+    # Проверка, выравнивается ли значение как число
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    return isinstance(value, str) and bool(re.fullmatch(_FLOAT_PATTERN, value.strip()))
+
+
+@_instrumented
+def concat(*tables):
+    '''
+        Объединение таблиц с одинаковыми заголовками (двух или любого количества).
+        Строки не копируются: возвращается представление TableView со ссылками на блоки строк исходных таблиц,
+        поэтому объединение сотен таблиц линейно по их количеству. Колоночные таблицы Table склеиваются по столбцам.
+    '''
+
+    # Проверка наличия таблиц
+    if not tables:
+        raise ValueError("Не переданы таблицы для объединения")
+
+    for data in tables:
+        # Проверка наличия данных
+        if not data:
+            raise ValueError(f"Нет данных в {data}")
+
+        # Проверка данных
+        if len(data) == 1:
+            raise ValueError(f"Таблица {data} содержит только заголовок")
+
+    header = tables[0][0]  # Заголовок первой таблицы
+
+    # Проверка совпадения форматов таблиц (заголовок каждой таблицы сравнивается один раз)
+    for data in tables[1:]:
+        if data[0] != header:
+            raise ValueError("Разные форматы таблиц")
+
+    row_count = sum(len(data) - 1 for data in tables)
+    _count(rows=row_count)
+
+    # Колоночные таблицы склеиваются по столбцам
+    if all(isinstance(data, Table) for data in tables):
+        _count(rows_copied=row_count)
+        if any(data.types != tables[0].types for data in tables):
+            raise ValueError("Разные форматы таблиц")
+        return Table(header, [Column.concat(*columns) for columns in zip(*(data.columns for data in tables))])
+
+    # Новые данные - ссылки на строки исходных таблиц
+    return TableView(header, [(data, 1, len(data)) for data in tables])
+
+
+@_instrumented
+def split(data, line_num):
+    # Проверка наличия данных
+    if not data:
+        raise ValueError("Нет данных")
+
+    # Проверка наличия рвзделительной строки
+    if not line_num:
+        raise ValueError("Не введено значение разделительной строки")
+
+    # Проверка данных
+    if len(data) == 1:
+        raise ValueError("Таблица содержит только заголовок")
+
+    # Проверка корректности переданного значения строки
+    if line_num >= len(data) - 1 or line_num <= 0:
+        raise ValueError("Значение разделительной строки введено некорректно")
+
+    header = data[0]  # Заголовок
+    _count(rows=len(data) - 1)
+
+    # Колоночная таблица делится срезами столбцов
+    if isinstance(data, Table):
+        return (Table(header, [column[:line_num] for column in data.columns]),
+                Table(header, [column[line_num:] for column in data.columns]))
+
+    # Новые таблицы - представления частей исходной таблицы без копирования строк
+    data1 = TableView(header, [(data, 1, line_num + 1)])
+    data2 = TableView(header, [(data, line_num + 1, len(data))])
+
+    return data1, data2
+
+
+@_instrumented
+def build_index(data, column=1, sorted_index=False):
+    '''
+        Построение индекса таблицы по значениям столбца (номер с 1 или название).
+        Хеш-индекс находит строки с заданным значением за O(1), без просмотра столбца.
+        При sorted_index=True дополнительно строится упорядоченный индекс для запросов по диапазону значений.
+        Значения сравниваются как есть: в нетипизированной таблице это строки, после set_column_types - значения типов.
+    '''
+
+    # Проверка наличия данных
+    if _is_stream(data):
+        raise ValueError("Индекс строится по таблице, а не по потоку строк")
+    if not data:
+        raise ValueError("Нет данных")
+
+    index = TableIndex(data, _column_index(data[0], column), sorted_index)
+    _remember_index(index)
+    return index
+
+
+@_instrumented
+def lookup(data, column, value, index=None):
+    '''
+        Строки таблицы, в которых значение столбца равно value (таблица с заголовком).
+        Используется переданный индекс или индекс, построенный для таблицы Table или TableView ранее
+        (build_index, lookup, join); если его нет, индекс строится и запоминается, поэтому повторные поиски
+        не просматривают столбец. Индекс списка строк не запоминается: для повторных поисков передайте index=build_index(...).
+    '''
+
+    if index is None:
+        index = _cached_index(data, column)
+    # Проверка соответствия индекса таблице
+    elif index.data is not data or index.column != _column_index(data[0], column):
+        raise ValueError("Индекс построен для другой таблицы или другого столбца")
+
+    return [list(data[0])] + [data[number] for number in index.rows(value)]
+
+
+@_instrumented
+def join(left, right, on=1, how='inner'):
+    '''
+        Соединение таблиц по равенству значений столбцов (хеш-соединение).
+        on - столбец (номер или название), общий для обеих таблиц, или пара (столбец left, столбец right).
+        how='inner' - только строки left, для которых есть строки right; how='left' - все строки left,
+        отсутствующие значения right заполняются None.
+        По right строится (или берётся ранее построенный) хеш-индекс, строки left только просматриваются,
+        поэтому left может быть потоком строк (iter_table) - тогда и результат возвращается потоком.
+        В результат входят столбцы left и столбцы right без столбца соединения;
+        совпадающие названия столбцов right получают суффикс '_right'.
+    '''
+
+    # Проверка типа соединения
+    if how not in ('inner', 'left'):
+        raise ValueError(f"Неизвестный тип соединения '{how}'. Используйте 'inner' или 'left'")
+
+    left_column, right_column = on if isinstance(on, (tuple, list)) else (on, on)
+
+    # Проверка наличия данных
+    if _is_stream(left):
+        left_rows = left
+        left_header = next(left_rows, None)
+    else:
+        left_rows = iter(left) if left else iter(())
+        left_header = next(left_rows, None)
+    if left_header is None:
+        raise ValueError("Нет данных")
+
+    left_idx = _column_index(left_header, left_column)
+    index = _cached_index(right, right_column)
+
+    # Заголовок результата
+    right_header = right[0]
+    right_indices = [i for i in range(len(right_header)) if i != index.column]
+    header = list(left_header)
+    for i in right_indices:
+        name = right_header[i]
+        header.append(f"{name}_right" if name in left_header else name)
+
+    rows = _join_rows(left_rows, left_idx, right, right_indices, index, how)
+    if _is_stream(left):
+        return itertools.chain([header], rows)
+    return [header] + list(rows)
+
+
+def _join_rows(left_rows, left_idx, right, right_indices, index, how):
+    # Поиск пар строк: каждая строка left ищется в хеш-индексе right
+    missing = [None] * len(right_indices)
+    for line in left_rows:
+        numbers = index.rows(line[left_idx])
+        if numbers:
+            for number in numbers:
+                right_line = right[number]
+                yield list(line) + [right_line[i] for i in right_indices]
+        elif how == 'left':
+            yield list(line) + missing
+
+
+class TableIndex:
+    '''
+        Индекс таблицы по столбцу: значение -> номера строк (с 1, как в get_rows_by_number).
+        Хеш-часть - словарь, для уникального значения хранится номер строки, для повторяющихся - список номеров.
+        Упорядоченная часть (sorted_index=True) - отсортированные значения и номера строк для поиска по диапазону.
+        Индекс не следит за изменениями таблицы: после изменения таблицы его нужно построить заново.
+        Таблицу Table или TableView индекс хранит по слабой ссылке и не удерживает её в памяти.
+    '''
+
+    def __init__(self, data, column, sorted_index=False):
+        try:
+            self._data_ref = weakref.ref(data, _drop_dead_indexes)
+            self._data = None
+        except TypeError:  # Список строк не поддерживает слабые ссылки
+            self._data_ref = None
+            self._data = data
+        self.column = column  # Номер столбца с 0
+        self.row_count = len(data) - 1
+
+        positions = {}
+        for number, value in enumerate(_index_values(data, column), 1):
+            found = positions.setdefault(value, number)
+            if found != number:
+                if isinstance(found, list):
+                    found.append(number)
+                else:
+                    positions[value] = [found, number]
+        self._positions = positions
+
+        self._sorted_values = None
+        self._sorted_rows = None
+        if sorted_index:
+            values = list(_index_values(data, column))
+            try:
+                order = sorted(range(self.row_count), key=values.__getitem__)
+            except TypeError:
+                raise TypeError("Значения столбца разных типов нельзя упорядочить. Приведите типы set_column_types")
+            self._sorted_values = [values[i] for i in order]
+            self._sorted_rows = array('q', (i + 1 for i in order))
+
+    @property
+    def data(self):
+        # Таблица индекса (None, если таблица Table или TableView уже удалена)
+        return self._data if self._data_ref is None else self._data_ref()
+
+    def __len__(self):
+        # Количество различных значений
+        return len(self._positions)
+
+    def __contains__(self, value):
+        return value in self._positions
+
+    def rows(self, value):
+        # Номера строк со значением value
+        found = self._positions.get(value)
+        if found is None:
+            return []
+        return list(found) if isinstance(found, list) else [found]
+
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        # Номера строк со значениями от low до high (границы None - без ограничения), в порядке значений
+        if self._sorted_values is None:
+            raise ValueError("Для поиска по диапазону постройте индекс с sorted_index=True")
+
+        start = 0
+        stop = len(self._sorted_values)
+        if low is not None:
+            start = (bisect.bisect_left if include_low else bisect.bisect_right)(self._sorted_values, low)
+        if high is not None:
+            stop = (bisect.bisect_right if include_high else bisect.bisect_left)(self._sorted_values, high)
+        return self._sorted_rows[start:stop].tolist() if start < stop else []
+
+    def __repr__(self):
+        return f"TableIndex(column={self.column + 1}, values={len(self)}, sorted={self._sorted_values is not None})"
+
+
+def _index_values(data, col_idx):
+    # Значения столбца без заголовка; колоночная таблица отдаёт столбец без сборки строк
+    if isinstance(data, Table):
+        return iter(data.columns[col_idx])
+    return map(operator.itemgetter(col_idx), itertools.islice(data, 1, None))
+
+
+_INDEX_CACHE_SIZE = 8  # Количество запоминаемых индексов таблиц
+_table_index_cache = collections.OrderedDict()  # (id таблицы, столбец) -> TableIndex
+
+
+def _remember_index(index):
+    # Запоминаются только индексы таблиц Table и TableView: на них индекс ссылается слабо,
+    # а список строк кеш удерживал бы в памяти (для списка индекс передаётся в lookup параметром index)
+    if index._data_ref is None:
+        return
+    key = (id(index.data), index.column)
+    _table_index_cache[key] = index
+    _table_index_cache.move_to_end(key)
+    while len(_table_index_cache) > _INDEX_CACHE_SIZE:
+        _table_index_cache.popitem(last=False)
+
+
+def _drop_dead_indexes(data_ref):
+    # Удаление из кеша индексов удалённой таблицы
+    for key, index in list(_table_index_cache.items()):
+        if index._data_ref is data_ref:
+            del _table_index_cache[key]
+
+
+def _forget_indexes(data):
+    # Удаление из кеша индексов таблицы, изменённой на месте (set_values, set_value, изменение TableView)
+    for key, index in list(_table_index_cache.items()):
+        if index.data is data:
+            del _table_index_cache[key]
+
+
+def _cached_index(data, column):
+    # Ранее построенный индекс таблицы (если количество строк не изменилось) или новый
+    if _is_stream(data):
+        raise ValueError("Индекс строится по таблице, а не по потоку строк")
+    if not data:
+        raise ValueError("Нет данных")
+
+    col_idx = _column_index(data[0], column)
+    index = _table_index_cache.get((id(data), col_idx))
+    if index is not None and index.data is data and index.row_count == len(data) - 1:
+        _table_index_cache.move_to_end((id(data), col_idx))
+        return index
+    return build_index(data, col_idx + 1)
+
+
+@_instrumented
+def group_by(data, keys, aggs, types=None, partial=False):
+    '''
+        Группировка строк по значениям столбцов keys и вычисление агрегатов за один проход.
+        data - таблица (список строк, Table, TableView) или поток строк (iter_table): строки читаются по одной,
+        для каждой группы хранятся только накопители агрегатов, поэтому память зависит от количества групп, а не строк.
+        keys - столбец или список столбцов (номера с 1 или названия).
+        aggs - словарь столбец -> агрегат или список агрегатов: 'count', 'sum', 'mean', 'min', 'max'.
+        types - словарь типов столбцов в формате set_column_types для приведения значений при чтении
+        (нужен для нетипизированных таблиц, чтобы min и max сравнивали числа и даты, а не строки).
+        Пустые значения ('' и None) в агрегатах не учитываются.
+        Возвращает таблицу: столбцы ключей и столбцы 'столбец_агрегат'.
+        При partial=True возвращает частичный результат GroupResult, который можно объединить
+        с результатами по другим файлам или частям (merge) - так работает group_by_files.
+    '''
+
+    rows = iter(data)
+
+    # Проверка наличия данных
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Нет данных")
+
+    # Проверка ключей группировки
+    if not isinstance(keys, (list, tuple)):
+        keys = [keys]
+    if not keys:
+        raise ValueError("Не указаны столбцы группировки")
+    key_idx = [_column_index(header, column) for column in keys]
+
+    # Проверка агрегатов
+    if not aggs:
+        raise ValueError("Не указаны агрегаты")
+    agg_idx = []
+    aggregates = []
+    for column, names in aggs.items():
+        col_idx = _column_index(header, column)
+        for name in ([names] if isinstance(names, str) else names):
+            if name not in _AGGREGATES:
+                raise ValueError(f"Неизвестный агрегат '{name}'. Используйте {', '.join(_AGGREGATES)}")
+            agg_idx.append(col_idx)
+            aggregates.append((header[col_idx], name))
+
+    casts = _column_type_map(header, types)
+    result = GroupResult([header[i] for i in key_idx], aggregates)
+    groups = result.groups
+    updates = [(col_idx, _AGGREGATES[name][1], name in ('sum', 'mean'), casts.get(col_idx), header[col_idx])
+               for col_idx, (_, name) in zip(agg_idx, aggregates)]
+    key_casts = [casts.get(i) for i in key_idx]
+    cast_keys = any(key_casts)
+    get_key = operator.itemgetter(*key_idx)
+    single_key = len(key_idx) == 1
+    initial = [_AGGREGATES[name][0] for _, name in aggregates]
+
+    for line in rows:
+        key = get_key(line)
+        if cast_keys:
+            key = tuple(_cast_value(value, to_type) if to_type else value
+                        for value, to_type in zip([key] if single_key else key, key_casts))
+            if single_key:
+                key = key[0]
+        state = groups.get(key)
+        if state is None:
+            state = groups[key] = initial.copy()
+
+        for j, (col_idx, update, numeric, to_type, name) in enumerate(updates):
+            value = line[col_idx]
+            if value is None or value == '':
+                continue
+            try:
+                if to_type:
+                    value = _cast_value(value, to_type)
+                elif numeric and isinstance(value, str):
+                    value = _number(value)
+            except ValueError:
+                raise ValueError(f"Не удалось привести значение '{value}' в столбце '{name}' к числу")
+            state[j] = update(state[j], value)
+
+    return result if partial else result.table()
+
+
+@_instrumented
+def group_by_files(*filenames, keys, aggs, types=None, workers=None, fmt=None):
+    '''
+        Группировка строк нескольких файлов (или набора по манифесту) без сборки общей таблицы.
+        Каждый файл обрабатывается group_by потоком строк, частичные результаты объединяются.
+        При workers > 1 файлы обрабатываются параллельно в нескольких процессах.
+    '''
+
+    # Проверка корректности количества процессов, если оно задано
+    if workers is not None and workers <= 0:
+        raise ValueError(f"Параметр workers = {workers} может быть только положительным")
+
+    filenames, fmt = _check_files(filenames, fmt)
+
+    if workers is None or workers == 1:
+        partials = (_group_file(filename, fmt, keys, aggs, types) for filename in filenames)
+        return _merge_partials(partials).table()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_group_file, filename, fmt, keys, aggs, types) for filename in filenames]
+        return _merge_partials(future.result() for future in futures).table()
+
+
+def _group_file(filename, fmt, keys, aggs, types):
+    # Частичный результат группировки одного файла (выполняется в процессе пула)
+    return group_by(iter_table(filename, fmt=fmt), keys, aggs, types, partial=True)
+
+
+def _merge_partials(partials):
+    result = None
+    for partial in partials:
+        if result is None:
+            result = partial
+        else:
+            result.merge(partial)
+    return result
+
+
+def _number(value):
+    # Число из строки нетипизированной таблицы
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _min_state(state, value):
+    return value if state is None or value < state else state
+
+
+def _max_state(state, value):
+    return value if state is None or value > state else state
+
+
+def _merge_min(state1, state2):
+    return state2 if state1 is None else state1 if state2 is None else min(state1, state2)
+
+
+def _merge_max(state1, state2):
+    return state2 if state1 is None else state1 if state2 is None else max(state1, state2)
+
+
+def _mean_state(state, value):
+    return state[0] + value, state[1] + 1
+
+
+def _merge_mean(state1, state2):
+    return state1[0] + state2[0], state1[1] + state2[1]
+
+
+def _mean_result(state):
+    return state[0] / state[1] if state[1] else None
+
+
+# Агрегаты: начальное значение накопителя, добавление значения, объединение накопителей, результат
+_AGGREGATES = {
+    'count': (0, lambda state, value: state + 1, operator.add, None),
+    'sum': (0, operator.add, operator.add, None),
+    'mean': ((0, 0), _mean_state, _merge_mean, _mean_result),
+    'min': (None, _min_state, _merge_min, None),
+    'max': (None, _max_state, _merge_max, None),
+}
+
+
+class GroupResult:
+    '''
+        Частичный результат group_by: накопители агрегатов для каждой группы.
+        Результаты по разным файлам или частям таблицы объединяются методом merge,
+        итоговая таблица строится методом table.
+    '''
+
+    def __init__(self, keys, aggregates):
+        self.keys = list(keys)  # Названия столбцов ключей
+        self.aggregates = list(aggregates)  # Пары (название столбца, агрегат)
+        self.groups = {}  # Ключ группы -> список накопителей
+
+    def merge(self, other):
+        # Проверка, что результаты получены одним запросом
+        if self.keys != other.keys or self.aggregates != other.aggregates:
+            raise ValueError("Нельзя объединить результаты группировки с разными ключами или агрегатами")
+
+        merges = [_AGGREGATES[name][2] for _, name in self.aggregates]
+        for key, other_state in other.groups.items():
+            state = self.groups.get(key)
+            if state is None:
+                self.groups[key] = list(other_state)
+            else:
+                for j, merge in enumerate(merges):
+                    state[j] = merge(state[j], other_state[j])
+        return self
+
+    def table(self):
+        # Таблица результатов: ключи группы и значения агрегатов
+        header = self.keys + [f"{column}_{name}" for column, name in self.aggregates]
+        results = [_AGGREGATES[name][3] for _, name in self.aggregates]
+        data = [header]
+        for key, state in self.groups.items():
+            line = list(key) if len(self.keys) > 1 else [key]
+            line.extend(result(value) if result else value for result, value in zip(results, state))
+            data.append(line)
+        return data
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __repr__(self):
+        return f"GroupResult(keys={self.keys!r}, aggregates={self.aggregates!r}, groups={len(self)})"
+
+
+_SORT_CHUNK_ROWS = 1_000_000  # Количество строк, сортируемых в памяти за раз
+_SORT_BATCH_ROWS = 10_000  # Количество строк в одной записи pickle временного файла
+
+
+@_instrumented
+def sort_table(*filenames, by, out=None, types=None, reverse=False, fmt=None, max_rows=None,
+               chunk_rows=_SORT_CHUNK_ROWS, tmp_dir=None):
+    '''
+        Сортировка таблицы из одного или нескольких файлов, которая может не помещаться в памяти.
+        Строки читаются потоком по chunk_rows, каждая часть сортируется в памяти и записывается
+        во временный файл (pickle по частям), затем отсортированные части объединяются слиянием (heapq.merge).
+        by - столбец или список столбцов сортировки (номера с 1 или названия).
+        types - словарь типов столбцов в формате set_column_types: ключи сравниваются как числа, даты и т.д.,
+        а не как строки; сами строки не изменяются. Пустые значения типизированных столбцов больше всех остальных.
+        out - файл результата: запись через save_table, с max_rows - в несколько файлов и манифест.
+        Если out не задан, возвращается поток отсортированных строк с заголовком.
+    '''
+
+    # Проверка корректности размера части
+    if chunk_rows <= 0:
+        raise ValueError(f"Параметр chunk_rows = {chunk_rows} может быть только положительным")
+
+    rows = iter_table(*filenames, fmt=fmt)
+    header = next(rows)
+
+    # Проверка столбцов сортировки
+    if not isinstance(by, (list, tuple)):
+        by = [by]
+    if not by:
+        raise ValueError("Не указаны столбцы сортировки")
+    key = _sort_key(header, [_column_index(header, column) for column in by], _column_type_map(header, types))
+
+    sorted_rows = _sorted_rows(rows, key, reverse, chunk_rows, tmp_dir)
+    if out is None:
+        return itertools.chain([header], sorted_rows)
+
+    try:
+        save_table(itertools.chain([header], sorted_rows), out, max_rows=max_rows)
+    finally:
+        sorted_rows.close()  # Удаление временных файлов, если запись прервана ошибкой
+
+
+def _sort_key(header, key_idx, casts):
+    # Функция ключа сортировки строки
+    if not any(i in casts for i in key_idx):
+        return operator.itemgetter(*key_idx) if len(key_idx) > 1 else operator.itemgetter(key_idx[0])
+
+    def key(line):
+        values = []
+        for i in key_idx:
+            value = line[i]
+            to_type = casts.get(i)
+            if to_type is None:
+                values.append(value)
+            elif value is None or value == '':
+                values.append((1, 0))  # Пустые значения после всех остальных
+            else:
+                try:
+                    values.append((0, _cast_value(value, to_type)))
+                except ValueError:
+                    raise ValueError(f"Не удалось привести значение '{value}' в столбце '{header[i]}' к типу {to_type}")
+        return tuple(values)
+
+    return key
+
+
+def _sorted_rows(rows, key, reverse, chunk_rows, tmp_dir):
+    # Отсортированные строки: одна часть сортируется в памяти, несколько - сливаются из временных файлов
+    chunk = list(itertools.islice(rows, chunk_rows))
+    chunk.sort(key=key, reverse=reverse)
+    next_chunk = list(itertools.islice(rows, chunk_rows))
+    if not next_chunk:
+        yield from chunk
+        return
+
+    run_dir = tempfile.mkdtemp(prefix='sort_table_', dir=tmp_dir)
+    try:
+        runs = [_write_run(run_dir, 0, chunk)]
+        del chunk
+        while next_chunk:
+            next_chunk.sort(key=key, reverse=reverse)
+            runs.append(_write_run(run_dir, len(runs), next_chunk))
+            next_chunk = list(itertools.islice(rows, chunk_rows))
+
+        # Слияние частей: в памяти по одной порции строк каждой части
+        yield from heapq.merge(*(_read_run(run) for run in runs), key=key, reverse=reverse)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def _write_run(run_dir, number, rows):
+    # Запись отсортированной части во временный файл порциями по _SORT_BATCH_ROWS строк
+    filename = os.path.join(run_dir, f"run_{number}.pkl")
+    with open(filename, 'wb') as f:
+        for start in range(0, len(rows), _SORT_BATCH_ROWS):
+            pickle.dump(rows[start:start + _SORT_BATCH_ROWS], f, protocol=pickle.HIGHEST_PROTOCOL)
+    return filename
+
+
+def _read_run(filename):
+    # Чтение временного файла по порциям
+    with open(filename, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+@_instrumented
+def detect_column_types(data, sample=None):
+    # Проверка наличия данных
+    if not data:
+        raise ValueError("Нет данных")
+
+    # Проверка данных
+    if len(data) == 1:
+        raise ValueError("Таблица содержит только заголовок")
+
+    # Определение типа по всем строкам (или по выборке строк) общим механизмом определения типов
+    return infer_column_types(data, sample=sample)
+
+
+# Определение типов столбцов
+
+# Шаблоны значений каждого типа (компилируются один раз при импорте модуля)
+_INT_PATTERN = r'[ \t]*[+-]?\d+[ \t]*'
+# Ветви шаблона не пересекаются (целая часть не делится на части), иначе проверка склеенной пачки значений,
+# не подходящей под шаблон, перебирает экспоненциальное число вариантов
+_FLOAT_PATTERN = r'[ \t]*[+-]?(?:\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|infinity|inf|nan)[ \t]*'
+_DATETIME_PATTERN = (r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?(?:Z|[+-]\d{2}:?\d{2})?)?'
+                     r'|\d{2}\.\d{2}\.\d{4}')
+_BOOL_VALUES = frozenset(("true", "false", "да", "нет"))  # 0 и 1 считаются целыми числами
+
+_TYPE_RE = {
+    'int': re.compile(_INT_PATTERN, re.IGNORECASE),
+    'float': re.compile(_FLOAT_PATTERN, re.IGNORECASE),
+    'datetime': re.compile(_DATETIME_PATTERN),
+}
+# Шаблоны для проверки целой пачки значений, склеенных через '\n', одним вызовом регулярного выражения
+_BULK_TYPE_RE = {
+    col_type: re.compile(f'(?:{pattern})(?:\n(?:{pattern}))*', re.IGNORECASE)
+    for col_type, pattern in (('int', _INT_PATTERN), ('float', _FLOAT_PATTERN), ('datetime', _DATETIME_PATTERN))
+}
+_BULK_BOOL_RE = re.compile('(?:true|false|да|нет)(?:\n(?:true|false|да|нет))*', re.IGNORECASE)
+
+_INFER_CHUNK = 10000  # Количество значений столбца, проверяемых за один вызов регулярного выражения
+
+
+def _parse_datetime(value):
+    # Дата в формате ISO или ДД.ММ.ГГГГ
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.datetime.strptime(value, "%d.%m.%Y")
+
+
+def _value_type(value):
+    # Тип одного значения
+    if not isinstance(value, str):
+        return _python_values_type([value])
+    if _TYPE_RE['int'].fullmatch(value):
+        return "int"
+    if _TYPE_RE['float'].fullmatch(value):
+        return "float"
+    if value.strip().lower() in _BOOL_VALUES:
+        return "bool"
+    if _TYPE_RE['datetime'].fullmatch(value):
+        try:
+            _parse_datetime(value)
+            return "datetime"
+        except ValueError:
+            pass
+    return "str"
+
+
+def _join_types(type1, type2):
+    # Общий тип двух значений: целые числа расширяются до float, остальные сочетания - строки
+    if type1 == type2:
+        return type1
+    if {type1, type2} == {'int', 'float'}:
+        return 'float'
+    return 'str'
+
+
+def _chunk_matches(col_type, chunk):
+    # Проверка пачки значений одним вызовом регулярного выражения
+    if col_type != 'bool' and col_type not in _BULK_TYPE_RE:
+        return False
+    try:
+        joined = '\n'.join(chunk)
+    except TypeError:  # В столбце есть уже типизированные значения
+        return False
+    # Значение с переводом строки (многострочная ячейка .csv) склеилось бы с соседними, такие пачки проверяются по одному
+    if joined.count('\n') != len(chunk) - 1:
+        return False
+    if col_type == 'bool':
+        return _BULK_BOOL_RE.fullmatch(joined) is not None
+    if not _BULK_TYPE_RE[col_type].fullmatch(joined):
+        return False
+    if col_type == 'datetime':
+        # Шаблон не проверяет корректность самой даты (например, 2024-13-45)
+        try:
+            for value in chunk:
+                _parse_datetime(value)
+        except ValueError:
+            return False
+    return True
 
 
-def get_column_types(filename, by_number=True):
-    # Импорт данных из файла
-    data = load_table(filename)
+def _infer_column_type(values, col_idx, strict=False):
+    col_type = None
+    values = iter(values)
+    while True:
+        chunk = list(itertools.islice(values, _INFER_CHUNK))
+        if not chunk:
+            break
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
+        # Тип столбца предполагается по первому значению
+        if col_type is None:
+            col_type = _value_type(chunk[0])
 
-    header = data[0]  # Заголовок
-    column_count = len(header)  # Количество столбцов в файле
+        # Если вся пачка подходит под текущий тип столбца (или int-пачка под float), значения не разбираются по одному
+        if _chunk_matches(col_type, chunk) or col_type == 'float' and _chunk_matches('int', chunk):
+            continue
 
-    # Первая строка после заголовка
-    first_line = data[1]
+        for value in chunk:
+            value_type = _value_type(value)
+            if value_type != col_type:
+                new_type = _join_types(col_type, value_type)
+                # Проверка остальных строк на соответствие типу столбца
+                if strict and new_type == 'str':
+                    raise TypeError(f"Разный тип значений в {col_idx}-м столбце")
+                col_type = new_type
 
-    # Функция для определения типа одного значения
-    def detect_type(value):
-        if value in ("True", "False"):
-            return "bool"
-        try:
-            int(value)
-            return "int"
-        except ValueError:
-            pass
-        try:
-            float(value)
-            return "float"
-        except ValueError:
-            pass
-        try:
-            datetime.datetime.fromisoformat(value)
-            return "datetime"
-        except ValueError:
-            pass
-        return "str"
+            # Дальше столбец можно не проверять: строковый тип уже не изменится
+            if col_type == 'str' and not strict:
+                return col_type
 
-    # Определение типа для каждого столбца по первой строки
-    column_types = {}
-    if by_number:
-        for col_idx in range(column_count):
-            column_types[col_idx + 1] = detect_type(first_line[col_idx])
-    else:
-        for col_idx in range(column_count):
-            column_types[header[col_idx]] = detect_type(first_line[col_idx])
-
-    # Проверка остальных строк на соответствие типу столбца
-    for col_idx in range(column_count):
-        for line in data[2:]:
-            current_type = detect_type(line[col_idx])
-            value_type = list(column_types.values())[col_idx]
-            if current_type != value_type:
+    return col_type or 'str'
+
+
+def _infer_stream_types(header, rows, strict=False):
+    # Типы столбцов потока: типы пачек по _INFER_CHUNK строк объединяются так же, как типы отдельных значений
+    types = [None] * len(header)
+    while True:
+        chunk = list(itertools.islice(rows, _INFER_CHUNK))
+        if not chunk:
+            break
+        for col_idx, col_type in enumerate(types):
+            # Строковый столбец дальше можно не проверять (кроме строгой проверки)
+            if col_type == 'str' and not strict:
+                continue
+            chunk_type = _infer_column_type(map(operator.itemgetter(col_idx), chunk), col_idx, strict)
+            if col_type is None:
+                types[col_idx] = chunk_type
+                continue
+            new_type = _join_types(col_type, chunk_type)
+            # Проверка остальных строк на соответствие типу столбца
+            if strict and new_type == 'str' and col_type != chunk_type:
                 raise TypeError(f"Разный тип значений в {col_idx}-м столбце")
+            types[col_idx] = new_type
+        # Дальше поток можно не читать: типы всех столбцов уже не изменятся
+        if not strict and all(col_type == 'str' for col_type in types):
+            break
+    return [col_type or 'str' for col_type in types]
 
-    return column_types
 
+def _sample_rows(data, sample, seed=None):
+    # Выборка строк без заголовка: первые sample строк и ещё sample случайных строк из оставшихся
+    rng = random.Random(seed)
+    if _is_stream(data):
+        head = list(itertools.islice(data, sample))
+        # Случайная выборка из потока неизвестной длины (reservoir sampling)
+        reservoir = []
+        for i, line in enumerate(data):
+            if i < sample:
+                reservoir.append(line)
+            else:
+                j = rng.randint(0, i)
+                if j < sample:
+                    reservoir[j] = line
+        return head + reservoir
+
+    head = data[1:sample + 1]
+    rest = range(sample + 1, len(data))
+    return head + [data[i] for i in sorted(rng.sample(rest, min(sample, len(rest))))]
 
-def set_column_types(filename, types_dict,
-                     by_number=True):  # Из задания е очень ясно, что должна делать эта функция, так что реализую её по смыслу программы
 
+@_instrumented
+def infer_column_types(data, sample=None, strict=False, seed=None):
     '''
-        Функция принимает файл и словарь с типами столбцов.
-        Функция возвращает данные из файла со значениями в столбцах, приведёнными к нужным типам из словаря types_dict.
-        Если в словаре types_dict не задан тип столбца, то функция оставляет тип столбца по умолчанию (str).
-        Параметр by_number даёт вункции понять, каким образом определены столбцы в словаре types_dict.
+        Определение типов столбцов таблицы (список строк с заголовком, поток строк или Table).
+        Каждый столбец проверяется за один проход: пачки значений сверяются с типом столбца одним регулярным выражением,
+        а строковый столбец перестаёт проверяться, как только тип становится str.
+        sample - количество первых строк и такое же количество случайных строк, по которым определяются типы (для больших таблиц).
+        strict=True - в столбце не должно быть значений несовместимых типов (иначе TypeError).
+        Возвращает список типов: 'int', 'float', 'bool', 'datetime' или 'str'.
     '''
 
-    # Импорт данных из файла
-    data = load_table(filename)
+    # Типы колоночной таблицы уже известны
+    if isinstance(data, Table):
+        return data.types
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
+    # Проверка корректности размера выборки
+    if sample is not None and sample <= 0:
+        raise ValueError(f"Параметр sample = {sample} может быть только положительным")
 
-    # Проверка наличия переданноый значений типов столбцов
-    if not types_dict:
-        raise ValueError("Значений типов столбцов не введены")
+    if _is_stream(data):
+        header = next(data, None)
+        rows = None if sample is None else _sample_rows(data, sample, seed)
+    else:
+        header = data[0] if data else None
+        rows = None if sample is None else _sample_rows(data, sample, seed)
 
-    header = data[0]  # заголовок
-    column_count = len(header)  # Количество столбцов в файле
+    # Проверка наличия данных
+    if header is None:
+        raise ValueError("Нет данных")
 
-    # Сопоставдение каждого индекса столбца с целевым типом столбца
-    col_type_map = {}
+    # Поток без выборки читается пачками строк, в памяти хранится только одна пачка
+    if rows is None and _is_stream(data):
+        return _infer_stream_types(header, data, strict)
 
-    if by_number:
-        for col_num, col_type in types_dict.items():
-            # Проверка введённого словаря на крректность
-            if not isinstance(col_num, int):
-                raise ValueError("Словарь введён некорректно")
-            real_index = col_num - 1
-            # Проверка индексов столбцов на корректность
-            if real_index < 0 or real_index >= column_count:
-                raise IndexError(f"Столбец с индексом {col_num} некорректен (всего столбцов: {column_count})")
-            col_type_map[real_index] = col_type
-    else:
-        for col_name, col_type in types_dict.items():
-            # Проверка введённого словаря на крректность
-            if isinstance(col_name, int):
-                raise ValueError("Словарь введён некорректно")
-            # Провека значений столбцов на корректность
-            if col_name not in header:
-                raise ValueError(f"В заголовке нет столбца с названием '{col_name}'")
-            real_index = header.index(col_name)
-            col_type_map[real_index] = col_type
+    types = []
+    for col_idx in range(len(header)):
+        lines = rows if rows is not None else itertools.islice(data, 1, None)
+        types.append(_infer_column_type(map(operator.itemgetter(col_idx), lines), col_idx, strict))
+    return types
+
+
+# Колоночное представление таблицы
+
+_EPOCH = datetime.datetime(1970, 1, 1)  # Начало отсчёта для хранения дат в столбцах datetime
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# Тип значений Python, который хранится в столбце каждого типа
+_PYTHON_TYPES = {'int': int, 'float': float, 'bool': bool, 'datetime': datetime.datetime, 'str': str}
 
-    # Функция приведения значения к нужному типу
-    def cast_value(value, to_type):
-        if to_type == 'int':
-            return int(value)
-        elif to_type == 'float':
-            return float(value)
-        elif to_type == 'bool':
-            return str(value).lower() in ('true', '1', 'yes')
-        elif to_type == 'datetime':
-            return datetime.datetime.fromisoformat(value)
+
+def _is_aware(value):
+    # Дата и время с часовым поясом
+    return isinstance(value, datetime.datetime) and value.tzinfo is not None
+
+
+class Column:
+    '''
+        Столбец таблицы, хранящийся одним компактным буфером.
+        int -> array('q'), float -> array('d'), bool -> битовая маска,
+        datetime -> array('q') с количеством микросекунд от 1970-01-01,
+        str -> смещения array('q') и байты UTF-8 всех значений подряд.
+        Значения других типов (например, None или смешанные типы) хранятся обычным списком (тип 'object').
+        Даты с часовым поясом и целые числа, не помещающиеся в 64 бита, тоже хранятся списком:
+        столбец, в который они попадают, становится 'object'.
+    '''
+
+    def __init__(self, col_type='str', values=()):
+        self.type = col_type if col_type in _PYTHON_TYPES else 'object'
+        self._length = 0
+        self._offsets = None  # Смещения значений (только для столбцов str)
+        if self.type in ('int', 'datetime'):
+            self._data = array('q')
+        elif self.type == 'float':
+            self._data = array('d')
+        elif self.type == 'bool':
+            self._data = bytearray()
+        elif self.type == 'str':
+            self._offsets = array('q', [0])
+            self._data = bytearray()
         else:
-            return str(value)
+            self._data = []
+        self.extend(values)
 
-    # Присвоение типов значений столбцов
-    for line_idx in range(1, len(data)):
-        for col_idx in range(column_count):
-            # Присвоение нового типа значениям в столбцах
-            current_type = col_type_map.get(col_idx, 'str')
-            original_value = data[line_idx][col_idx]
-            try:
-                data[line_idx][col_idx] = cast_value(original_value, current_type)
-            except ValueError:
-                raise ValueError(
-                    f"Не удалось привести значение '{original_value}' в столбце '{header[col_idx]}' к типу {current_type}"
-                )
+    def __len__(self):
+        return self._length
 
-    return data
+    def __iter__(self):
+        data = self._data
+        if self.type in ('int', 'float'):
+            return iter(data)
+        if self.type == 'datetime':
+            return (_EPOCH + value * _MICROSECOND for value in data)
+        if self.type == 'bool':
+            return (bool(data[i >> 3] >> (i & 7) & 1) for i in range(self._length))
+        if self.type == 'str':
+            offsets = self._offsets
+            return (str(data[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(self._length))
+        return iter(data)
 
+    def __getitem__(self, index):
+        # Срез возвращает новый столбец того же типа (копируется только часть буфера этого столбца)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return Column(self.type, itertools.islice(self, start, stop, step))
+            return self._slice(start, max(start, stop))
 
-def get_values(data, column=1):
-    # Проверка наличия данных
-    if not data:
-        raise ValueError("Нет данных")
+        # Проверка корректности индекса
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("Индекс значения столбца вне диапазона")
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
+        data = self._data
+        if self.type in ('int', 'float') or self.type == 'object':
+            return data[index]
+        if self.type == 'datetime':
+            return _EPOCH + data[index] * _MICROSECOND
+        if self.type == 'bool':
+            return bool(data[index >> 3] >> (index & 7) & 1)
+        return str(data[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
 
-    header = data[0]  # Заголовок
-    column_count = len(header)  # Количество столбцов в файле
+    def __setitem__(self, index, value):
+        # Проверка корректности индекса
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("Индекс значения столбца вне диапазона")
 
-    # Определение индекса столбца
-    if isinstance(column, int):
-        # Проверка корректности индекса введенного столбца
-        if column <= 0 or column > column_count:
-            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
-        col_idx = column - 1
-    else:
-        # Проверка корректности названия введенного столбца
-        if column not in header:
-            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
-        col_idx = header.index(column)
+        self._make_writable()
+        if self.type == 'datetime' and _is_aware(value):
+            self._to_object()
+        if self.type == 'str':
+            # Значения строк имеют разную длину, поэтому буфер столбца собирается заново
+            values = list(self)
+            values[index] = value
+            replaced = Column('str', values)
+            self._offsets, self._data = replaced._offsets, replaced._data
+        elif self.type == 'bool':
+            if value:
+                self._data[index >> 3] |= 1 << (index & 7)
+            else:
+                self._data[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        else:
+            try:
+                self._data[index] = self._encode(value)
+            except OverflowError:
+                self._to_object()
+                self._data[index] = value
 
-    # Предполагается, что таблица уже типизирована (если вызывалась set_column_types),
-    values = [line[col_idx] for line in data[1:]]
+    def __eq__(self, other):
+        if isinstance(other, (Column, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
 
-    return values
+    def __repr__(self):
+        return f"Column({self.type!r}, {list(itertools.islice(self, 10))}{', ...' if self._length > 10 else ''})"
 
+    def _encode(self, value):
+        # Приведение значения Python к виду, в котором оно хранится в буфере
+        if self.type == 'datetime':
+            if not isinstance(value, datetime.datetime):
+                value = datetime.datetime.combine(value, datetime.time())
+            return (value - _EPOCH) // _MICROSECOND
+        return value
 
-def get_value(data, column=1):
-    # Проверка наличия данных
-    if not data:
-        raise ValueError("Нет данных")
+    def _to_object(self):
+        # Переход столбца к хранению списком (для дат с часовым поясом, смещение которых в буфере не хранится,
+        # и целых чисел больше 64 бит)
+        self._data = list(self)
+        self.type = 'object'
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
-    if len(data) > 2:
-        raise ValueError("В таблице должна быть одна строка без учёта заголовка")
+    def append(self, value):
+        self._make_writable()
+        if self.type == 'datetime' and _is_aware(value):
+            self._to_object()
+        if self.type == 'str':
+            self._data += str(value).encode('utf-8')
+            self._offsets.append(len(self._data))
+        elif self.type == 'bool':
+            if not self._length & 7:
+                self._data.append(0)
+            if value:
+                self._data[self._length >> 3] |= 1 << (self._length & 7)
+        else:
+            try:
+                self._data.append(self._encode(value))
+            except OverflowError:
+                self._to_object()
+                self._data.append(value)
+        self._length += 1
 
-    header = data[0]  # Заголовок
-    column_count = len(header)  # Количество столбцов в файле
+    def extend(self, values):
+        self._make_writable()
+        before = len(self._data)
+        if self.type == 'object':
+            self._data.extend(values)
+            self._length += len(self._data) - before
+        elif self.type in ('int', 'float'):
+            values = values if isinstance(values, (list, tuple, Column)) else list(values)
+            try:
+                self._data.extend(values)
+            except OverflowError:
+                # Число не помещается в буфер: добавленная часть значений отбрасывается, и столбец хранится списком
+                del self._data[before:]
+                self._to_object()
+                self._data.extend(values)
+            self._length += len(self._data) - before
+        elif self.type == 'datetime':
+            values = values if isinstance(values, (list, tuple, Column)) else list(values)
+            if any(map(_is_aware, values)):
+                self._to_object()
+                self._data.extend(values)
+            else:
+                self._data.extend(map(self._encode, values))
+            self._length += len(self._data) - before
+        elif self.type == 'str':
+            # Значения кодируются все сразу, смещения считаются накопленной суммой длин
+            encoded = [str(value).encode('utf-8') for value in values]
+            self._offsets.extend(itertools.islice(itertools.accumulate(map(len, encoded), initial=before), 1, None))
+            self._data += b''.join(encoded)
+            self._length += len(encoded)
+        else:
+            for value in values:
+                self.append(value)
 
-    # Определение индекса столбца
-    if isinstance(column, int):
-        # Проверка корректности индекса введенного столбца
-        if column <= 0 or column > column_count:
-            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
-        col_idx = column - 1
-    else:
-        # Проверка корректности названия введенного столбца
-        if column not in header:
-            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
-        col_idx = header.index(column)
+    def _make_writable(self):
+        # Столбец, открытый из файла .tbl, хранит представления memoryview только для чтения: перед изменением они копируются
+        if isinstance(self._data, memoryview):
+            if self.type in ('int', 'float', 'datetime'):
+                data = array(self._data.format)
+                data.frombytes(self._data.cast('B'))
+                self._data = data
+            else:
+                self._data = bytearray(self._data)
+        if isinstance(self._offsets, memoryview):
+            offsets = array('q')
+            offsets.frombytes(self._offsets.cast('B'))
+            self._offsets = offsets
 
-    # Предполагается, что таблица уже типизирована (если вызывалась set_column_types),
-    value = data[1][col_idx]
+    def __reduce_ex__(self, protocol):
+        # При протоколе 5 буферы столбца передаются через PickleBuffer: с buffer_callback они записываются вне pickle,
+        # а загруженный столбец ссылается на переданные при загрузке буферы без копирования
+        if protocol < 5 or self.type == 'object':
+            return super().__reduce_ex__(protocol)
+        buffers = {name: pickle.PickleBuffer(buffer) for name, buffer in self._buffers().items()}
+        return Column._unpickle, (self.type, self._length, buffers, sys.byteorder)
 
-    return value
+    @classmethod
+    def _unpickle(cls, col_type, length, buffers, byteorder):
+        return cls._from_buffers(col_type, length, {name: memoryview(buffer) for name, buffer in buffers.items()},
+                                 swap_bytes=byteorder != sys.byteorder)
 
+    def _view(self, start, stop):
+        # Столбец строк start..stop, ссылающийся на буфер этого столбца (для записи в .pkl и копий таблиц из кеша;
+        # при изменении такой столбец сначала копирует буфер в _make_writable)
+        if self.type == 'object' or self.type == 'bool' and start & 7:
+            return self._slice(start, stop)
 
-def set_values(data, values, column=1):
-    # Проверка наличия данных
-    if not data:
-        raise ValueError("Нет данных")
-    if not values:
-        raise ValueError(f"Нет данных о значениях столбца {column}")
+        view = Column(self.type)
+        view._length = stop - start
+        data = memoryview(self._data)
+        if self.type == 'str':
+            offsets = self._offsets
+            base = offsets[start]
+            view._data = data[base:offsets[stop]]
+            if base:
+                view._offsets = array('q', (offset - base for offset in offsets[start:stop + 1]))
+            else:
+                view._offsets = memoryview(offsets)[start:stop + 1]
+        elif self.type == 'bool':
+            view._data = data[start >> 3:(stop + 7) >> 3]
+        else:
+            view._data = data[start:stop]
+        return view
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
+    def _buffers(self):
+        # Буферы столбца для записи в файл .tbl
+        if self.type == 'str':
+            return {'offsets': self._offsets, 'data': self._data}
+        if self.type == 'bool':
+            return {'data': self._data[:(self._length + 7) // 8]}
+        return {'data': self._data}
 
-    # Проверка корректрости переданных значений в столбце
-    if len(data) - 1 != len(values):
-        raise ValueError(
-            "Количество значений в переданном столбце не совпадает с количеством значений в столбце таблицы")
+    @classmethod
+    def _from_buffers(cls, col_type, length, buffers, swap_bytes=False):
+        # Столбец поверх готовых буферов (например, частей файла, открытого через mmap) без копирования значений
+        column = cls(col_type)
+        column._length = length
+        if col_type in ('int', 'float', 'datetime'):
+            typecode = 'd' if col_type == 'float' else 'q'
+            column._data = buffers['data'].cast(typecode)
+        elif col_type == 'str':
+            column._offsets = buffers['offsets'].cast('q')
+            column._data = buffers['data']
+        else:
+            column._data = buffers['data']
 
-    header = data[0]  # Заголовок
-    column_count = len(header)  # Количество столбцов в файле
-    new_data = [header]  # Новый список данных
+        # Файл записан на машине с другим порядком байтов: значения копируются и переставляются
+        if swap_bytes:
+            column._make_writable()
+            for buffer in (column._data, column._offsets):
+                if isinstance(buffer, array):
+                    buffer.byteswap()
+        return column
 
-    # Определение индекса столбца
-    if isinstance(column, int):
-        # Проверка корректности индекса введенного столбца
-        if column <= 0 or column > column_count:
-            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
+    def _slice(self, start, stop):
+        if self.type == 'bool':
+            return Column('bool', (self[i] for i in range(start, stop)))
 
-        col_idx = column - 1
-    else:
-        # Проверка корректности названия введенного столбца
-        if column not in header:
-            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
-        col_idx = header.index(column)
+        new_column = Column(self.type)
+        new_column._length = stop - start
+        if self.type == 'str':
+            offsets = self._offsets
+            base = offsets[start]
+            new_column._data = self._data[base:offsets[stop]]
+            new_column._offsets = array('q', (offset - base for offset in offsets[start:stop + 1]))
+        else:
+            new_column._data = self._data[start:stop]
+        return new_column
 
-    # Заполнение нового списка данных
-    for line_idx, line in enumerate(data[1:]):
-        new_line = []
-        for idx, el in enumerate(line):
-            if idx == col_idx:
-                # Проверка на совпадение типа значения с типом столбца
-                if type(el) == type(values[line_idx]):
-                    new_line.append(values[line_idx])
-                else:
-                    raise TypeError(f"Тип значения {values[line_idx]} не совпадает с типом столбца {column}")
+    @classmethod
+    def concat(cls, *columns):
+        # Склейка столбцов одного типа: буферы копируются целиком, без обхода значений по одному
+        col_type = columns[0].type
+        if any(column.type != col_type for column in columns):
+            raise TypeError("Нельзя объединить столбцы разных типов")
+
+        new_column = cls(col_type)
+        for column in columns:
+            if col_type == 'str':
+                shift = len(new_column._data)
+                new_column._data += column._data
+                new_column._offsets.extend(offset + shift for offset in column._offsets[1:column._length + 1])
+                new_column._length += column._length
+            elif col_type in ('bool', 'object'):
+                new_column.extend(column)
             else:
-                new_line.append(el)
-        new_data.append(new_line)
+                new_column._data.frombytes(memoryview(column._data).cast('B'))
+                new_column._length += column._length
+        return new_column
 
-    return new_data
+    @property
+    def nbytes(self):
+        # Размер буферов столбца в байтах
+        if self.type == 'object':
+            return sum(sys.getsizeof(value) for value in self._data)
+        size = len(self._data) * getattr(self._data, 'itemsize', 1)
+        if self._offsets is not None:
+            size += len(self._offsets) * self._offsets.itemsize
+        return size
 
 
-def set_value(data, value, column=1):
-    # Проверка наличия данных
-    if not data:
-        raise ValueError("Нет данных")
-    if not value:
-        raise ValueError(f"Нет данный о значении столбца {column}")
+class Table:
+    '''
+        Колоночная таблица: заголовок, список столбцов Column и их типы.
+        Для совместимости с остальными функциями модуля таблица ведёт себя как список строк с заголовком:
+        table[0] - заголовок, table[i] - i-я строка, len(table) - количество строк вместе с заголовком.
+    '''
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
-    if len(data) > 2:
-        raise ValueError("В таблице должна быть одна строка без учёта заголовка")
+    def __init__(self, header, columns):
+        # Проверка соответствия заголовка и столбцов
+        if len(header) != len(columns):
+            raise ValueError("Количество столбцов не совпадает с заголовком")
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Столбцы таблицы имеют разную длину")
 
-    header = data[0]  # Заголовок
-    column_count = len(header)  # Количество столбцов в файле
-    new_data = [header]  # Новый список данных
+        self.header = list(header)
+        self.columns = list(columns)
 
-    # Определение индекса столбца
-    if isinstance(column, int):
-        # Проверка корректности индекса введенного столбца
-        if column <= 0 or column > column_count:
-            raise IndexError(f"Некорректный номер столбца: {column}. Всего столбцов: {column_count}")
+    @classmethod
+    def from_rows(cls, data, types=None):
+        '''
+            Создание таблицы из списка строк с заголовком или из потока строк (iter_table).
+            types - список типов столбцов или словарь в формате set_column_types (номер или название столбца -> тип).
+            Если тип столбца не задан, он определяется по типам значений Python.
+        '''
 
-        col_idx = column - 1
-    else:
-        # Проверка корректности названия введенного столбца
-        if column not in header:
-            raise ValueError(f"В заголовке нет столбца с названием '{column}'")
-        col_idx = header.index(column)
+        rows = iter(data)
 
-    # Заполнение нового списка данных
-    new_line = []
-    for el_idx in range(column_count):
-        el = data[1][el_idx]
-        if el_idx == col_idx:
-            # Проверка на совпадение типа значения с типом столбца
-            if type(el) == type(value):
-                new_line.append(value)
-            else:
-                raise TypeError(f"Тип значения {value} не совпадает с типом столбца {column}")
-        else:
-            new_line.append(el)
-    new_data.append(new_line)
+        # Проверка наличия данных
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("Нет данных")
 
-    return new_data
+        column_count = len(header)
+        if isinstance(types, dict):
+            types = [types.get(col_idx + 1, types.get(header[col_idx])) for col_idx in range(column_count)]
+        elif types is None:
+            types = [None] * column_count
 
+        # Столбцы без заданного типа собираются списками и типизируются после чтения
+        columns = [Column(col_type) if col_type else [] for col_type in types]
+        for line in rows:
+            if len(line) != column_count:
+                raise ValueError("Некорректная структура столбцов")
+            for column, value in zip(columns, line):
+                column.append(value)
 
-def print_table(data):
-    # Проверка наличия данных
-    if not data:
-        raise ValueError("Нет данных")
+        for col_idx, column in enumerate(columns):
+            if isinstance(column, list):
+                columns[col_idx] = Column(_python_values_type(column), column)
 
-    # Красивый вывод
-    print(tabulate(data[1:], data[0], tablefmt="fancy_grid"))
+        return cls(header, columns)
 
+    @property
+    def types(self):
+        return [column.type for column in self.columns]
 
-def concat(data1, data2):
-    # Проверка наличия данных data1
-    if not data1:
-        raise ValueError(f"Нет данных в {data1}")
+    @property
+    def row_count(self):
+        return len(self.columns[0]) if self.columns else 0
 
-    # Проверка данных data1
-    if len(data1) == 1:
-        raise ValueError(f"Таблица {data1} содержит только заголовок")
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns)
 
-    # Проверка наличия данных data2
-    if not data2:
-        raise ValueError(f"Нет данных в {data2}")
+    def column(self, column=1):
+        # Столбец по номеру (с 1) или названию
+        return self.columns[_column_index(self.header, column)]
 
-    # Проверка данных data2
-    if len(data2) == 1:
-        raise ValueError(f"Таблица {data2} содержит только заголовок")
+    def rows(self):
+        # Строки таблицы без заголовка
+        return (list(line) for line in zip(*self.columns))
 
-    header1 = data1[0]  # Заголовок data1
-    header2 = data2[0]  # Заголовок data2
-    column_count1 = len(header1)  # Количество столбцов в data1
-    column_count2 = len(header2)  # Количество столбцов в data2
+    def __len__(self):
+        return self.row_count + 1
 
-    # Проверка совпадения форматов data1 и data2
-    if header1 != header2 or column_count1 != column_count2:
-        raise ValueError("Разные форматы таблиц")
+    def __iter__(self):
+        yield list(self.header)
+        yield from self.rows()
 
-    # Создание новых данных
-    new_data = []
-    new_data.extend(data1)
-    new_data.extend(data2[1:])
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index == 0:
+            return list(self.header)
+        if index < 0 or index >= len(self):
+            raise IndexError("Номер строки вне диапазона")
+        return [column[index - 1] for column in self.columns]
 
-    return new_data
+    def __eq__(self, other):
+        if isinstance(other, (Table, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
 
+    def __repr__(self):
+        return f"Table({self.header!r}, rows={self.row_count}, types={self.types!r})"
 
-def split(data, line_num):
-    # Проверка наличия данных
-    if not data:
-        raise ValueError("Нет данных")
 
-    # Проверка наличия рвзделительной строки
-    if not line_num:
-        raise ValueError("Не введено значение разделительной строки")
+class TableView:
+    '''
+        Представление таблицы из блоков строк других таблиц (результат concat и split).
+        Строки не копируются: хранятся ссылки на исходные таблицы и диапазоны номеров строк в них,
+        поэтому изменения исходных таблиц видны в представлении.
+        При первом изменении самого представления (присваивание строки, append, extend, set_values с inplace=True)
+        строки копируются в собственный список, после чего представление от исходных таблиц не зависит.
+        Ведёт себя как список строк с заголовком: view[0] - заголовок, len(view) - количество строк вместе с заголовком.
+    '''
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
+    def __init__(self, header, blocks):
+        self.header = list(header)
+        self._blocks = []  # Блоки (исходная таблица, первая строка, строка после последней)
+        self._starts = []  # Номер первой строки каждого блока в представлении
+        self._rows = None  # Собственные строки после материализации
+        self._length = 1
 
-    # Проверка корректности переданного значения строки
-    if line_num >= len(data) - 1 or line_num <= 0:
-        raise ValueError("Значение разделительной строки введено некорректно")
+        for source, start, stop in blocks:
+            if stop <= start:
+                continue
+            # Представление другого представления ссылается сразу на исходные блоки, без вложенности
+            if isinstance(source, TableView) and source._rows is None:
+                sub_blocks = source._sub_blocks(start, stop)
+            else:
+                sub_blocks = [(source, start, stop)]
+            for block in sub_blocks:
+                self._blocks.append(block)
+                self._starts.append(self._length)
+                self._length += block[2] - block[1]
 
-    header = data[0]  # Заголовок
+    def _sub_blocks(self, start, stop):
+        # Исходные блоки, из которых состоят строки представления start..stop-1
+        result = []
+        for (source, block_start, block_stop), first in zip(self._blocks, self._starts):
+            last = first + block_stop - block_start
+            low, high = max(start, first), min(stop, last)
+            if low < high:
+                result.append((source, block_start + low - first, block_start + high - first))
+        return result
 
-    # Новые таблицы
-    data1 = [header]
-    data2 = [header]
-    data1.extend(data[1:(line_num + 1)])
-    data2.extend(data[(line_num + 1):])
+    def materialize(self):
+        # Копирование строк в собственный список (выполняется один раз); вызывается перед каждым изменением представления
+        _forget_indexes(self)
+        if self._rows is None:
+            rows = [self.header]
+            rows.extend(list(line) for line in itertools.islice(self, 1, None))
+            self._rows = rows
+            self._blocks = []
+            self._starts = []
+        return self._rows
 
-    return data1, data2
+    def __len__(self):
+        if self._rows is not None:
+            return len(self._rows)
+        return self._length
 
+    def __iter__(self):
+        if self._rows is not None:
+            yield from self._rows
+            return
+        yield self.header
+        for source, start, stop in self._blocks:
+            if isinstance(source, list):
+                yield from itertools.islice(source, start, stop)
+            else:
+                yield from source[start:stop]
 
-def detect_column_types(data):
-    # Проверка наличия данных
-    if not data:
-        raise ValueError("Нет данных")
+    def __getitem__(self, index):
+        if self._rows is not None:
+            return self._rows[index]
 
-    # Проверка данных
-    if len(data) == 1:
-        raise ValueError("Таблица содержит только заголовок")
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self[start:stop][::step] if start < stop else []
+            result = []
+            if start == 0 and stop > 0:
+                result.append(self.header)
+                start = 1
+            for source, block_start, block_stop in self._sub_blocks(start, stop):
+                result.extend(source[block_start:block_stop])
+            return result
 
-    header = data[0]  # Заголовок
-    column_count = len(data[0])  # Количество строк
-    first_data_line = data[1]  # Первая строка после заголовка
+        if index < 0:
+            index += len(self)
+        if index == 0:
+            return self.header
+        if index < 0 or index >= len(self):
+            raise IndexError("Номер строки вне диапазона")
+        block_idx = bisect.bisect_right(self._starts, index) - 1
+        source, block_start, _ = self._blocks[block_idx]
+        return source[block_start + index - self._starts[block_idx]]
 
-    # Функции для определения типа
-    def is_int(value: str) -> bool:
-        try:
-            int(value)
-            return True
-        except ValueError:
-            return False
+    def __setitem__(self, index, line):
+        self.materialize()[index] = line
 
-    def is_float(value: str) -> bool:
-        try:
-            float(value)
-            return True
-        except ValueError:
-            return False
+    def append(self, line):
+        self.materialize().append(line)
 
-    def is_bool(value: str) -> bool:
-        lower_val = value.strip().lower()
-        return lower_val in ("true", "false", "0", "1", "да", "нет")
+    def extend(self, lines):
+        self.materialize().extend(lines)
 
-    def is_date(value: str, date_formats=None) -> bool:
-        import datetime
-        if date_formats is None:
-            date_formats = ["%Y-%m-%d", "%d.%m.%Y"]
-        for fmt in date_formats:
-            try:
-                datetime.datetime.strptime(value, fmt)
-                return True
-            except ValueError:
-                continue
-        return False
+    def __eq__(self, other):
+        if isinstance(other, (TableView, Table, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
 
-    # Определение типа по первой строке после заголовка
-    detected_types = []
-    for val in first_data_line:
-        if is_int(val):
-            detected_types.append("int")
-        elif is_float(val):
-            detected_types.append("float")
-        elif is_bool(val):
-            detected_types.append("bool")
-        elif is_date(val):
-            detected_types.append("date")
-        else:
-            detected_types.append("str")
+    def __repr__(self):
+        return f"TableView({self.header!r}, rows={len(self) - 1}, blocks={len(self._blocks)})"
 
-    return detected_types
 
+def _python_values_type(values):
+    # Тип столбца по типам значений Python (bool проверяется отдельно, так как bool - подкласс int)
+    value_types = {type(value) for value in values}
+    if len(value_types) == 1:
+        value_type = value_types.pop()
+        for col_type, python_type in _PYTHON_TYPES.items():
+            if value_type is python_type:
+                return col_type
+    if not value_types:
+        return 'str'
+    return 'object'
@@ -0,0 +1,228 @@
+# Регрессионные проверки функций lab3/main.py
+#
+# Запуск: python -m pytest lab3/test_main.py
+
+import datetime
+import os
+import time
+
+import pytest
+
+from main import *
+
+
+def test_infer_float_column_with_bad_value_is_fast():
+    # Целые числа в столбце float и одно нечисловое значение: проверка пачки не должна перебирать варианты шаблона.
+    # Перебор растёт экспоненциально с числом строк (30 строк - уже секунды), поэтому на 10 000 строк он
+    # не уложится ни в какую границу, а линейная проверка занимает миллисекунды и на загруженной машине
+    data = [['x'], ['1.5']] + [['12345']] * 10_000 + [['abc']]
+    start = time.perf_counter()
+    assert infer_column_types(data) == ['str']
+    assert time.perf_counter() - start < 30
+
+
+def test_infer_multiline_value_is_not_number():
+    # Многострочная ячейка .csv не должна склеиваться с соседними значениями пачки
+    assert infer_column_types([['x'], ['1'], ['1\n2'], ['3']]) == ['str']
+
+
+def test_load_since_stops_before_open_quoted_field(tmp_path):
+    # Перевод строки внутри незакрытых кавычек не заканчивает запись: недописанная запись читается в следующий раз
+    filename = str(tmp_path / 'log.csv')
+    with open(filename, 'w', newline='') as f:
+        f.write('id;v\n1;a\n2;"line1\nli')
+    assert load_table(filename, since_offset=0) == ([['id', 'v'], ['1', 'a']], 9)
+    with open(filename, 'a', newline='') as f:
+        f.write('ne2"\n')
+    assert load_table(filename, since_offset=9) == ([['id', 'v'], ['2', 'line1\nline2']], 25)
+
+
+def test_numpy_datetime_rejects_empty_value(tmp_path):
+    # NumPy приводит '' и 'NaT' к NaT без ошибки, а значение должно считаться некорректным
+    pytest.importorskip('numpy')
+    filename = str(tmp_path / 'dates.csv')
+    save_table([['d'], ['2024-01-01'], ['']], filename)
+    with pytest.raises(ValueError, match="Не удалось привести значение ''"):
+        set_column_types(filename, {1: 'datetime'}, backend='numpy')
+
+
+def test_tbl_header_only(tmp_path):
+    # У таблицы без строк блок смещений столбца str не пустой, файл всё равно должен открываться
+    filename = str(tmp_path / 'empty.tbl')
+    save_table([['a', 'b']], filename)
+    assert load_table(filename) == [['a', 'b']]
+
+
+def test_corrupted_gzip_raises_value_error(tmp_path):
+    # Ошибка распаковки gzip (zlib.error) заменяется на ValueError, как у bz2 и xz
+    filename = str(tmp_path / 'data.csv.gz')
+    save_table([['a', 'b']] + [[str(i), 'x' * 20] for i in range(10_000)], filename)
+    with open(filename, 'r+b') as f:
+        f.seek(100)
+        f.write(bytes(byte ^ 0x55 for byte in f.read(100)))
+    with pytest.raises(ValueError, match='повреждён'):
+        load_table(filename)
+
+
+def test_aware_datetime_keeps_offset_in_table(tmp_path):
+    # Дата с часовым поясом не переводится в UTC: список строк и таблица Table возвращают одно и то же значение
+    filename = str(tmp_path / 'tz.csv')
+    save_table([['d'], ['2024-01-01T10:00+03:00']], filename)
+    rows = set_column_types(filename, {1: 'datetime'})
+    table = set_column_types(filename, {1: 'datetime'}, as_table=True)
+    assert table.types == ['object']
+    assert table[1] == rows[1]
+    assert table[1][0].utcoffset() == datetime.timedelta(hours=3)
+
+
+def test_pkl_from_table_loads_as_table(tmp_path):
+    # Файл .pkl, записанный из таблицы Table, загружается столбцами, а не списками строк
+    filename = str(tmp_path / 'data.pkl')
+    table = Table.from_rows([['a', 'b']] + [[i, str(i)] for i in range(100)])
+    save_table(table, filename)
+    loaded = load_table(filename)
+    assert isinstance(loaded, Table)
+    assert loaded.types == ['int', 'str']
+    assert loaded == table
+
+
+def test_parallel_csv_boundaries_skip_quoted_newlines(tmp_path, monkeypatch):
+    # Границы частей .csv не попадают внутрь многострочных ячеек, индекс смещений (.idx) при этом не записывается
+    import main
+    monkeypatch.setattr(main, '_PARALLEL_CHUNK_BYTES', 256)
+    filename = str(tmp_path / 'data.csv')
+    rows = [['id', 'text']] + [[str(i), 'line\n"quoted"\nline' if i % 3 else 'plain'] for i in range(200)]
+    save_table(rows, filename)
+    assert len(main._split_byte_ranges(filename, '.csv')) > 1
+    assert load_table(filename, workers=2) == rows
+    assert not (tmp_path / 'data.csv.idx').exists()
+
+
+def _stray_quote_csv(filename, count=40):
+    # Кавычка внутри поля без кавычек (csv.reader считает её обычным символом) и многострочные записи в кавычках
+    with open(filename, 'w', newline='') as f:
+        f.write('id;text\n1;5" screen\n')
+        f.writelines(f'{i};"multi\nline {i}"\n' for i in range(2, count))
+
+
+def test_load_since_with_stray_quote(tmp_path):
+    # Концы записей находятся тем же разбором, что и при полной загрузке
+    filename = str(tmp_path / 'log.csv')
+    _stray_quote_csv(filename)
+    rows, offset = load_table(filename, since_offset=0)
+    assert rows == load_table(filename)
+    assert rows[-1] == ['39', 'multi\nline 39']
+    assert offset == os.path.getsize(filename)
+
+
+def test_pkl_objects_are_loaded_once(tmp_path, monkeypatch):
+    # Файл прежнего формата и файл из групп строк загружаются без повторного разбора pickle
+    import main
+    import pickle
+    calls = []
+    loads = pickle.loads
+    monkeypatch.setattr(main.pickle, 'loads', lambda *args, **kwargs: calls.append(1) or loads(*args, **kwargs))
+    rows = [['a', 'b']] + [[i, str(i)] for i in range(100)]
+
+    legacy = str(tmp_path / 'legacy.pkl')
+    with open(legacy, 'wb') as f:
+        pickle.dump(rows, f)
+    assert load_table(legacy) == rows
+    assert len(calls) == 1
+
+    grouped = str(tmp_path / 'grouped.pkl')
+    save_table(rows, grouped)
+    calls.clear()
+    assert load_table(grouped) == rows
+    assert len(calls) == 2  # Заголовок и одна группа строк
+
+
+def test_numpy_bool_from_typed_column(tmp_path):
+    # Значения уже типизированного столбца .tbl приводятся к bool через str, как в backend='python'
+    pytest.importorskip('numpy')
+    filename = str(tmp_path / 'typed.tbl')
+    save_table(Table.from_rows([['a'], [1], [0]]), filename)
+    assert set_column_types(filename, {1: 'bool'}, backend='numpy') == [['a'], [True], [False]]
+
+
+def test_wide_int_column_is_object(tmp_path):
+    # Целое число больше 64 бит не помещается в array('q'): столбец хранится списком, как в списке строк
+    filename = str(tmp_path / 'big.csv')
+    save_table([['a'], ['1'], [str(2 ** 70)]], filename)
+    rows = set_column_types(filename, {1: 'int'})
+    table = set_column_types(filename, {1: 'int'}, as_table=True)
+    assert table.types == ['object']
+    assert table == rows == [['a'], [1], [2 ** 70]]
+
+
+def test_parallel_csv_with_stray_quote(tmp_path, monkeypatch):
+    # Кавычка в поле без кавычек сбивает подсчёт кавычек при поиске границ: файл разбирается одним куском
+    import main
+    monkeypatch.setattr(main, '_PARALLEL_CHUNK_BYTES', 256)
+    filename = str(tmp_path / 'data.csv')
+    _stray_quote_csv(filename, 200)
+    assert load_table(filename, workers=2) == load_table(filename)
+
+
+def test_set_column_types_result_is_independent_of_cache(tmp_path):
+    # Изменение результата не меняет таблицу в кеше: столбцы копии копируют буфер при первом изменении
+    filename = str(tmp_path / 'data.csv')
+    save_table([['a', 'b'], ['1', 'x'], ['2', 'y']], filename)
+    table_cache_clear()
+    first = set_column_types(filename, {1: 'int'}, as_table=True)
+    first.columns[0][0] = 99
+    first.columns[1].append('z')
+    second = set_column_types(filename, {1: 'int'}, as_table=True)
+    assert table_cache_info()['hits'] >= 1
+    assert second == [['a', 'b'], [1, 'x'], [2, 'y']]
+
+
+def test_row_offsets_cache_is_bounded(tmp_path):
+    # Индексы смещений строк запоминаются для ограниченного числа файлов и читаются из файла индекса через mmap
+    import main
+    table_cache_clear()
+    for number in range(main._ROW_OFFSETS_CACHE_SIZE + 3):
+        filename = str(tmp_path / f'log_{number}.csv')
+        save_table([['a'], ['1'], ['2']], filename)
+        offsets = main._row_offsets(filename, '.csv')
+        assert isinstance(offsets, memoryview)
+        assert list(offsets) == [0, 3, 6, 9]  # Записи "a\r\n", "1\r\n", "2\r\n"
+    assert len(main._row_offsets_cache) == main._ROW_OFFSETS_CACHE_SIZE
+    table_cache_clear()
+    assert not main._row_offsets_cache
+
+
+@pytest.mark.parametrize('name', ['data.csv.gz', 'data.tbl'])
+def test_shard_checksum_matches_written_file(tmp_path, name):
+    # Контрольная сумма считается при записи и совпадает с содержимым файла на диске
+    import hashlib
+    import json
+    filename = str(tmp_path / name)
+    save_table([['a', 'b']] + [[str(i), 'x'] for i in range(25)], filename, max_rows=10)
+    with open(str(tmp_path / 'data_manifest.json'), encoding='utf-8') as f:
+        shards = json.load(f)['shards']
+    assert len(shards) == 3
+    for shard in shards:
+        with open(str(tmp_path / shard['file']), 'rb') as f:
+            content = f.read()
+        assert shard['bytes'] == len(content)
+        assert shard['sha256'] == hashlib.sha256(content).hexdigest()
+
+
+def test_print_table_page_holds_page_size_rows():
+    # Страница содержит page_size строк таблицы, линии-разделители не учитываются
+    class Pages:
+        def __init__(self):
+            self.chunks = []
+
+        def write(self, text):
+            if text != '\n':
+                self.chunks.append(text)
+
+        def flush(self):
+            pass
+
+    pages = Pages()
+    print_table([['a']] + [[str(i)] for i in range(5)], max_width=10, page_size=2, file=pages)
+    rows = [[line for line in chunk.split('\n') if line.startswith('│')] for chunk in pages.chunks]
+    assert [len(page) for page in rows] == [3, 2, 1]  # Первая страница - заголовок и две строки
@@ -1,5 +1,263 @@
+# Командная строка для потоковой работы с таблицами на функциях lab3/main.py
+#
+# Примеры:
+#   python lab4/main.py select data.csv -c name -c age -w "age >= 18" | python lab4/main.py head -n 20
+#   python lab4/main.py cast data.csv -t age=int -t created=datetime -o typed.csv
+#   cat big.csv | python lab4/main.py slice --start 1000 --stop 2000 > part.csv
+#   python lab4/main.py shard big.csv.gz --max-rows 1000000 -o parts.csv
+# Входной файл "-" (или отсутствие входных файлов) - стандартный ввод, без -o результат пишется в стандартный вывод.
+# Строки читаются и записываются потоком, поэтому таблица целиком в памяти не собирается.
+# Модуль lab3 (и tabulate, нужный только для вывода небольших таблиц) загружается только при выполнении команды.
 
+import argparse
+import importlib.util
+import io
+import itertools
+import os
+import re
+import sys
+
+
+_LAB3_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lab3', 'main.py')
+_LAB3_NAME = 'lab3_main'  # Имя модуля lab3/main.py (оба файла называются main.py, поэтому модуль загружается по пути)
+_STDIO = '-'  # Имя входного файла для стандартного ввода
+_STDIO_FORMAT = '.csv'  # Формат стандартного ввода и вывода по умолчанию
+
+# Условие отбора строк: "столбец операция значение", например "age >= 18" или "city in Москва,Казань"
+_WHERE_RE = re.compile(r'\s*(.+?)\s*(==|!=|<=|>=|<|>|\s+not\s+in\s+|\s+in\s+)\s*(.*?)\s*', re.IGNORECASE)
+
+
+def _lab3():
+    # Загрузка lab3/main.py при первом обращении
+    module = sys.modules.get(_LAB3_NAME)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(_LAB3_NAME, _LAB3_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[_LAB3_NAME] = module  # Модуль нужен в sys.modules процессам записи и разбора файлов
+        spec.loader.exec_module(module)
+    return module
+
+
+def _column(text):
+    # Столбец задаётся номером (с 1) или названием
+    return int(text) if text.isdigit() else text
+
+
+def _value(text):
+    # Значение условия: число, логическое значение или строка (кавычки позволяют задать строку из цифр)
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ('"', "'"):
+        return text[1:-1]
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    if text.lower() in ('true', 'false'):
+        return text.lower() == 'true'
+    return text
+
+
+def _condition(text):
+    # Разбор условия отбора строк в кортеж (столбец, операция, значение) для iter_table
+    match = _WHERE_RE.fullmatch(text)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"Некорректное условие '{text}'. Пример: \"age >= 18\"")
+    column, op, value = match.groups()
+    op = ' '.join(op.lower().split())
+    if op in ('in', 'not in'):
+        return _column(column), op, [_value(item.strip()) for item in value.split(',')]
+    return _column(column), op, _value(value)
+
+
+def _column_type(text):
+    # Тип столбца в виде "столбец=тип"
+    column, sep, col_type = text.rpartition('=')
+    if not sep or not column:
+        raise argparse.ArgumentTypeError(f"Некорректный тип столбца '{text}'. Пример: age=int")
+    return _column(column), col_type
+
+
+def _positive(text):
+    number = int(text)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"Значение {text} может быть только положительным")
+    return number
+
+
+def _input_rows(args, columns=None, where=None):
+    # Поток строк всех входных файлов (стандартный ввод - через "-"); заголовки и столбцы проверяет iter_table
+    inputs = args.inputs or [_STDIO]
+    if inputs.count(_STDIO) > 1:
+        raise ValueError("Стандартный ввод можно указать только один раз")
+
+    fmt = args.format
+    if _STDIO in inputs:
+        fmt = fmt or _STDIO_FORMAT
+        stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='' if fmt == '.csv' else None)
+        inputs = [stdin if filename == _STDIO else filename for filename in inputs]
+    return _lab3().iter_table(*inputs, fmt=fmt, columns=columns, where=where, delimiter=args.delimiter)
+
+
+def _write_rows(rows, args, output=None):
+    # Запись потока строк в файл (формат по расширению) или в стандартный вывод
+    output = output or args.output
+    if output and output != _STDIO:
+        _lab3().save_table(rows, output, delimiter=args.output_delimiter)
+        return
+
+    fmt = args.output_format or _STDIO_FORMAT
+    stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='' if fmt == '.csv' else None)
+    try:
+        _lab3().save_table(rows, stdout, fmt=fmt, delimiter=args.output_delimiter)
+        stdout.flush()
+    finally:
+        stdout.detach()  # sys.stdout остаётся открытым
+
+
+def _select(args):
+    _write_rows(_input_rows(args, args.columns, args.where), args)
+
+
+def _slice(args):
+    rows = _lab3().get_rows_by_number(_input_rows(args), args.start, args.stop)
+    _write_rows(rows, args)
+
+
+def _types(args):
+    rows = _input_rows(args)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Нет данных")
+    lab3 = _lab3()
+    types = lab3.infer_column_types(itertools.chain([header], rows), sample=args.sample, strict=args.strict)
+    result = [['Номер', 'Столбец', 'Тип']]
+    result.extend([col_num, name, col_type] for col_num, (name, col_type) in enumerate(zip(header, types), 1))
+    _write_rows(iter(result), args)
+
+
+def _cast(args):
+    types_dict = dict(args.types)
+    # Номера столбцов и названия в одном вызове не смешиваются (как в set_column_types)
+    by_number = all(isinstance(column, int) for column in types_dict)
+    if not by_number:
+        types_dict = {str(column): col_type for column, col_type in types_dict.items()}
+    _write_rows(_lab3().set_column_types(_input_rows(args), types_dict, by_number=by_number), args)
+
+
+def _concat(args):
+    # Объединение файлов с одинаковыми заголовками - последовательное чтение всех входных файлов
+    _write_rows(_input_rows(args), args)
+
+
+def _split(args):
+    # Первые line строк записываются в первый файл, остальные - во второй; строки не накапливаются в памяти
+    rows = _input_rows(args)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Нет данных")
+
+    first, second = args.output
+    count = [0]  # Количество строк, записанных в первый файл
+
+    def first_part():
+        for line in itertools.islice(rows, args.line):
+            count[0] += 1
+            yield line
+
+    _write_rows(itertools.chain([header], first_part()), args, first)
+    rest = next(rows, None)
+    # Проверка корректности разделительной строки (как в split, по количеству прочитанных строк)
+    if count[0] < args.line or rest is None:
+        if first != _STDIO:
+            os.remove(first)
+        raise ValueError("Значение разделительной строки введено некорректно")
+    _write_rows(itertools.chain([header, rest], rows), args, second)
+
+
+def _shard(args):
+    _lab3().save_table(_input_rows(args), args.output, max_rows=args.max_rows, workers=args.workers,
+                       delimiter=args.output_delimiter, compression=args.compression)
+
+
+def _head(args):
+    # Читается только args.lines строк; вывод в виде сетки, как print_table
+    rows = _input_rows(args)
+    _lab3().print_table(itertools.islice(rows, args.lines + 1), max_width=args.max_width)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(description="Потоковая обработка таблиц .csv, .txt, .pkl и .tbl")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='команда')
+
+    def command(name, func, help, output=True):
+        sub = commands.add_parser(name, help=help, description=help)
+        sub.set_defaults(func=func)
+        sub.add_argument('inputs', nargs='*', metavar='файл',
+                         help="входные файлы (или манифест набора файлов); '-' или без файлов - стандартный ввод")
+        sub.add_argument('-f', '--format', help="формат входных данных (.csv или .txt для стандартного ввода)")
+        sub.add_argument('-d', '--delimiter', help="разделитель входных .csv (по умолчанию определяется автоматически)")
+        if output:
+            sub.add_argument('-o', '--output', help="выходной файл (по умолчанию стандартный вывод)")
+            sub.add_argument('-F', '--output-format', choices=('.csv', '.txt'),
+                             help="формат стандартного вывода (по умолчанию .csv)")
+            sub.add_argument('-D', '--output-delimiter', help="разделитель выходных .csv (по умолчанию ';')")
+        return sub
+
+    sub = command('select', _select, "отбор столбцов и строк")
+    sub.add_argument('-c', '--column', dest='columns', action='append', type=_column,
+                     help="оставляемый столбец (номер или название), можно указать несколько раз")
+    sub.add_argument('-w', '--where', action='append', type=_condition,
+                     help="условие отбора строк, например \"age >= 18\" (несколько условий должны выполняться вместе)")
+
+    sub = command('slice', _slice, "строки с номерами от start до stop включительно")
+    sub.add_argument('-s', '--start', type=int, required=True, help="номер первой строки (с 1)")
+    sub.add_argument('-e', '--stop', type=int, help="номер последней строки (по умолчанию равен start)")
+
+    sub = command('types', _types, "типы столбцов")
+    sub.add_argument('--sample', type=_positive, help="определять типы по первым и случайным sample строкам")
+    sub.add_argument('--strict', action='store_true', help="ошибка, если в столбце значения разных типов")
+
+    sub = command('cast', _cast, "приведение столбцов к типам int, float, bool, datetime или str")
+    sub.add_argument('-t', '--type', dest='types', action='append', type=_column_type, required=True,
+                     help="тип столбца в виде столбец=тип, можно указать несколько раз")
+
+    command('concat', _concat, "объединение таблиц с одинаковыми заголовками")
+
+    sub = command('split', _split, "разделение таблицы на две по номеру строки", output=False)
+    sub.add_argument('-l', '--line', type=_positive, required=True, help="количество строк в первой таблице")
+    sub.add_argument('-o', '--output', nargs=2, required=True, metavar=('первый', 'второй'),
+                     help="файлы частей таблицы")
+    sub.add_argument('-D', '--output-delimiter', help="разделитель выходных .csv (по умолчанию ';')")
+    sub.set_defaults(output_format=None)
+
+    sub = command('shard', _shard, "запись таблицы в несколько файлов с манифестом", output=False)
+    sub.add_argument('-n', '--max-rows', type=_positive, required=True, help="количество строк в одном файле")
+    sub.add_argument('-o', '--output', required=True, help="имя файлов набора: parts.csv -> parts_1.csv, ...")
+    sub.add_argument('-D', '--output-delimiter', help="разделитель выходных .csv (по умолчанию ';')")
+    sub.add_argument('-j', '--workers', type=_positive, help="количество потоков записи")
+    sub.add_argument('-z', '--compression', choices=('gzip', 'bz2', 'xz', 'zstd'), help="сжатие файлов")
+
+    sub = command('head', _head, "вывод первых строк в виде таблицы", output=False)
+    sub.add_argument('-n', '--lines', type=_positive, default=10, help="количество строк (по умолчанию 10)")
+    sub.add_argument('-w', '--max-width', type=_positive, help="наибольшая ширина столбца")
+
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    try:
+        args.func(args)
+    except BrokenPipeError:
+        # Читающая сторона канала закрылась раньше (например, head): остаток вывода не нужен
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except (ValueError, IndexError, TypeError, FileNotFoundError, ImportError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    pass
+    sys.exit(main())